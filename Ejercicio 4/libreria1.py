@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+
+
+# Columnas de identificación que no son calificaciones aunque sean números
+COLUMNAS_ID = {"id", "nombre", "alumno", "estudiante", "matricula", "matrícula"}
+
+
+def cargar_notas(ruta):
+    """Carga una matriz alumnos x calificaciones desde .npy o .csv"""
+    if ruta.endswith(".npy"):
+        notas = np.load(ruta)
+    else:
+        notas = _leer_csv(ruta)
+    return np.atleast_2d(np.asarray(notas, dtype=float))
+
+
+def _leer_csv(ruta):
+    """CSV con cabecera opcional; se saltan columnas de nombre o identificación"""
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        primera = [c.strip().lower() for c in archivo.readline().split(",")]
+    # Las celdas no numéricas quedan como nan
+    tabla = np.genfromtxt(ruta, delimiter=",", dtype=float, encoding="utf-8", ndmin=2)
+    resto = tabla[1:] if len(tabla) > 1 else tabla
+    con_numeros = ~np.isnan(resto).all(axis=0)
+    # Es cabecera si tiene texto donde el resto de la columna es numérico
+    # (o si es la única fila y no tiene ningún número)
+    cabecera = bool((np.isnan(tabla[0]) & con_numeros).any()) if len(tabla) > 1 else bool(np.isnan(tabla[0]).all())
+    if cabecera:
+        tabla = tabla[1:]
+    # Columna de datos: la que tiene algún número (el nombre no tiene ninguno)
+    con_numeros = ~np.isnan(tabla).all(axis=0)
+    columnas = [j for j in range(tabla.shape[1])
+                if con_numeros[j] and not (cabecera and j < len(primera) and primera[j] in COLUMNAS_ID)]
+    if not len(tabla) or not columnas:
+        raise ValueError(f"{ruta} no tiene calificaciones")
+    notas = tabla[:, columnas]
+    faltan = np.argwhere(np.isnan(notas))
+    if faltan.size:
+        i, j = faltan[0]
+        raise ValueError(f"valor no numérico en {ruta}, fila {i + 1 + cabecera}, columna {columnas[j] + 1}")
+    return notas
+
+
+def notas():
+    ruta = input("Archivo de notas (.csv/.npy, vacío para capturar a mano): ").strip()
+    if ruta:
+        if os.path.exists(ruta):
+            datos = cargar_notas(ruta)
+            print(f"{datos.shape[0]} alumnos, {datos.shape[1]} calificaciones cada uno")
+            return datos
+        print("No existe el archivo, se capturan a mano")
+    valores = input("Calificaciones separadas por coma: ").split(",")
+    return np.array([[float(v) for v in valores]])
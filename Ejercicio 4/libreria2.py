@@ -0,0 +1,16 @@
+import numpy as np
+
+
+def promedio(notas, pesos=None):
+    """Promedio por alumno (una fila por alumno), ponderado si hay pesos"""
+    notas = np.atleast_2d(np.asarray(notas, dtype=float))
+    if pesos is None:
+        return notas.mean(axis=1)
+    return promedio_ponderado(notas, pesos)
+
+
+def promedio_ponderado(notas, pesos):
+    pesos = np.asarray(pesos, dtype=float)
+    if pesos.shape != (notas.shape[1],):
+        raise ValueError(f"se esperaban {notas.shape[1]} pesos, llegaron {pesos.size}")
+    return notas @ (pesos / pesos.sum())
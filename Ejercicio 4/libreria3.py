@@ -1,9 +1,31 @@
+import numpy as np
+
+EXCELENTE = 8
+APROBADO = 6
+CATEGORIAS = np.array(["Excelente trabajo", "Aprobado", "Reprobado"])
+
+
+def clasificar(promedios):
+    """Índice de categoría por alumno: 0 Excelente, 1 Aprobado, 2 Reprobado"""
+    promedios = np.asarray(promedios)
+    return 2 - (promedios >= APROBADO).astype(np.int8) - (promedios >= EXCELENTE)
+
+
+def resumen(clases):
+    cuentas = np.bincount(clases, minlength=len(CATEGORIAS))
+    return dict(zip(CATEGORIAS.tolist(), cuentas.tolist()))
+
 
 def mostrar_resultado(promedio):
-    print(f"\n Promedio final: {promedio:.2f}")
-    if promedio >= 8:
-        print(" Excelente trabajo")
-    elif promedio >= 6:
-        print(" Aprobado")
-    else:
-        print("Reprobado")
\ No newline at end of file
+    promedios = np.atleast_1d(promedio)
+    if promedios.size == 0:
+        print("\n No hay alumnos")
+        return
+    clases = clasificar(promedios)
+    if promedios.size == 1:
+        print(f"\n Promedio final: {float(promedios[0]):.2f}")
+        print(f" {CATEGORIAS[clases[0]]}")
+        return
+    print(f"\n {promedios.size} alumnos | Promedio del grupo: {promedios.mean():.2f}")
+    for categoria, cuenta in resumen(clases).items():
+        print(f" {categoria}: {cuenta} ({cuenta / promedios.size:.1%})")
@@ -1,8 +1,44 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
 import libreria1
 import libreria2 
 import libreria3
 
-print("sistema de gestion de notas")
-notas = libreria1.notas()
-promedio = libreria2.promedio(notas)
-libreria3.mostrar_resultado(promedio)
\ No newline at end of file
+
+def benchmark(alumnos=1_000_000, materias=5):
+    rng = np.random.default_rng(0)
+    notas = rng.uniform(0, 10, (alumnos, materias))
+    pesos = rng.random(materias)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "notas.npy")
+        np.save(ruta, notas)
+        t0 = time.perf_counter()
+        notas = libreria1.cargar_notas(ruta)
+        carga = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    promedios = libreria2.promedio(notas, pesos)
+    clases = libreria3.clasificar(promedios)
+    conteo = libreria3.resumen(clases)
+    calculo = time.perf_counter() - t0
+    print(f"{alumnos} alumnos x {materias} materias")
+    print(f"  carga .npy: {carga:.3f} s | promedio ponderado + clasificación: {calculo:.3f} s")
+    print(conteo)
+
+
+if "--bench" in sys.argv:
+    benchmark()
+else:
+    print("sistema de gestion de notas")
+    while True:
+        try:
+            notas = libreria1.notas()
+            break
+        except ValueError as e:
+            print(f"Error: {e}. Intente de nuevo")
+    promedio = libreria2.promedio(notas)
+    libreria3.mostrar_resultado(promedio)
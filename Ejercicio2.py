@@ -1,60 +1,857 @@
 
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from collections import OrderedDict
+from fractions import Fraction
+
 import numpy as np
 
-def ingresar_matriz(nombre):
+# Por debajo de esta densidad (nnz / elementos) conviene el formato disperso
+UMBRAL_DENSIDAD = 0.1
+# Matrices más chicas que esto se quedan densas: lo disperso no compensa
+MIN_ELEMENTOS_DISPERSO = 10_000
+# Tipos elegibles con --dtype; sin flag se infiere de la entrada
+TIPOS = {'float64': np.float64, 'float32': np.float32, 'int': np.int64, 'exacto': object}
+# El modo exacto usa Fraction (Python puro): solo para matrices pequeñas
+MAX_ELEMENTOS_EXACTO = 400
+
+
+class MatrizDispersa:
+    """Matriz dispersa en formato CSR (indptr, indices, datos)"""
+
+    # Hace que ndarray ceda los operadores (+, -, @) a esta clase
+    __array_ufunc__ = None
+
+    def __init__(self, indptr, indices, datos, shape):
+        self.indptr = indptr
+        self.indices = indices
+        self.datos = datos
+        self.shape = tuple(shape)
+
+    # --------- Construcción ----------
+    @classmethod
+    def desde_coo(cls, filas, cols, vals, shape):
+        """Construye CSR desde tripletas; suma duplicados y descarta ceros"""
+        m, n = shape
+        filas = np.asarray(filas, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        vals = np.asarray(vals)
+        if filas.size and (filas.min() < 0 or filas.max() >= m or cols.min() < 0 or cols.max() >= n):
+            raise ValueError(f"índice fuera de rango para una matriz {m}x{n}")
+        clave = filas * n + cols
+        orden = np.argsort(clave, kind="stable")
+        clave = clave[orden]
+        vals = vals[orden]
+        if clave.size:
+            inicio = np.flatnonzero(np.r_[True, clave[1:] != clave[:-1]])
+            clave = clave[inicio]
+            vals = np.add.reduceat(vals, inicio)
+        no_cero = vals != 0
+        clave, vals = clave[no_cero], vals[no_cero]
+        filas, cols = np.divmod(clave, n) if n else (clave, clave)
+        indptr = np.zeros(m + 1, dtype=np.int64)
+        np.cumsum(np.bincount(filas, minlength=m), out=indptr[1:])
+        return cls(indptr, cols, vals, (m, n))
+
+    @classmethod
+    def desde_densa(cls, a):
+        filas, cols = np.nonzero(a)
+        return cls.desde_coo(filas, cols, a[filas, cols], a.shape)
+
+    # --------- Consultas ----------
+    @property
+    def nnz(self):
+        return int(self.datos.size)
+
+    @property
+    def densidad(self):
+        total = self.shape[0] * self.shape[1]
+        return self.nnz / total if total else 0.0
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.datos.nbytes
+
+    def filas_coo(self):
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def toarray(self):
+        a = np.zeros(self.shape, dtype=self.datos.dtype)
+        a[self.filas_coo(), self.indices] = self.datos
+        return a
+
+    # --------- Operaciones ----------
+    @property
+    def T(self):
+        return MatrizDispersa.desde_coo(self.indices, self.filas_coo(), self.datos, self.shape[::-1])
+
+    def _misma_forma(self, otra, simbolo):
+        if self.shape != otra.shape:
+            raise ValueError(f"formas incompatibles para '{simbolo}': {self.shape} y {otra.shape}")
+
+    def _combinar(self, otra, signo, simbolo):
+        if isinstance(otra, MatrizDispersa):
+            self._misma_forma(otra, simbolo)
+            return MatrizDispersa.desde_coo(
+                np.concatenate([self.filas_coo(), otra.filas_coo()]),
+                np.concatenate([self.indices, otra.indices]),
+                np.concatenate([self.datos, signo * otra.datos]),
+                self.shape,
+            )
+        otra = np.asarray(otra)
+        self._misma_forma(otra, simbolo)
+        res = signo * otra.astype(np.result_type(otra, self.datos))
+        res[self.filas_coo(), self.indices] += self.datos
+        return res
+
+    def __add__(self, otra):
+        return self._combinar(otra, 1, "+")
+
+    __radd__ = __add__
+
+    def __sub__(self, otra):
+        return self._combinar(otra, -1, "-")
+
+    def __rsub__(self, otra):
+        return -(self._combinar(otra, -1, "-"))
+
+    def __neg__(self):
+        return MatrizDispersa(self.indptr, self.indices, -self.datos, self.shape)
+
+    def __matmul__(self, otra):
+        m, k = self.shape
+        if otra.shape[0] != k:
+            raise ValueError(f"formas incompatibles para '@': {self.shape} y {otra.shape}")
+        if not isinstance(otra, MatrizDispersa):
+            return self._por_densa(np.asarray(otra))
+        n = otra.shape[1]
+        cuenta = np.diff(otra.indptr)[self.indices]
+        productos = int(cuenta.sum())
+        # Si el relleno deja el resultado casi denso, BLAS denso gana
+        if productos > UMBRAL_DENSIDAD * m * n:
+            return self.toarray() @ otra.toarray()
+        # Cada no-cero A[i,p] se expande contra la fila p de B
+        base = np.repeat(otra.indptr[self.indices], cuenta)
+        desplaz = np.arange(productos) - np.repeat(np.cumsum(cuenta) - cuenta, cuenta)
+        pos = base + desplaz
+        return MatrizDispersa.desde_coo(
+            np.repeat(self.filas_coo(), cuenta),
+            otra.indices[pos],
+            np.repeat(self.datos, cuenta) * otra.datos[pos],
+            (m, n),
+        )
+
+    def __rmatmul__(self, otra):
+        otra = np.asarray(otra)
+        if otra.shape[-1] != self.shape[0]:
+            raise ValueError(f"formas incompatibles para '@': {otra.shape} y {self.shape}")
+        return (self.T._por_densa(otra.T)).T
+
+    def _por_densa(self, d, bloque=2**22):
+        """Por tramos de filas: el temporal (nnz del tramo x columnas) ronda `bloque` elementos"""
+        m = self.shape[0]
+        res = np.zeros((m, d.shape[1]), dtype=np.result_type(self.datos, d))
+        por_tramo = max(1, bloque // max(1, d.shape[1]))
+        i = 0
+        while i < m:
+            # Filas i..j-1 con a lo sumo por_tramo no-ceros (al menos una fila)
+            j = int(np.searchsorted(self.indptr, self.indptr[i] + por_tramo, side="right")) - 1
+            j = min(m, max(i + 1, j))
+            a, b = self.indptr[i], self.indptr[j]
+            if b > a:
+                con_datos = i + np.flatnonzero(np.diff(self.indptr[i:j + 1]))
+                aportes = self.datos[a:b, None] * d[self.indices[a:b]]
+                res[con_datos] = np.add.reduceat(aportes, self.indptr[con_datos] - a, axis=0)
+            i = j
+        return res
+
+    def __str__(self):
+        m, n = self.shape
+        lineas = [f"Matriz dispersa {m}x{n}, {self.nnz} no-ceros ({self.densidad:.4%})"]
+        filas = self.filas_coo()
+        for i, j, v in zip(filas[:20], self.indices[:20], self.datos[:20]):
+            lineas.append(f"  ({i}, {j}) = {v}")
+        if self.nnz > 20:
+            lineas.append("  ...")
+        return "\n".join(lineas)
+
+    __repr__ = __str__
+
+
+def _parece_entero(token):
+    try:
+        int(token)
+        return True
+    except ValueError:
+        return False
+
+
+def convertir(filas, tipo=None):
+    """Convierte filas de texto en un arreglo del tipo pedido (o inferido)"""
+    if tipo is None:
+        tipo = 'int' if all(_parece_entero(t) for fila in filas for t in fila) else 'float64'
+    if tipo == 'exacto':
+        if sum(len(fila) for fila in filas) > MAX_ELEMENTOS_EXACTO:
+            raise ValueError(f"el modo exacto admite hasta {MAX_ELEMENTOS_EXACTO} elementos")
+        return np.array([[Fraction(t) for t in fila] for fila in filas], dtype=object)
+    if tipo == 'int':
+        m = np.array([[int(t) for t in fila] for fila in filas], dtype=np.int64)
+        return m.astype(tipo_entero_minimo(m))
+    return np.array([[float(t) for t in fila] for fila in filas], dtype=TIPOS[tipo])
+
+
+def tipo_entero_minimo(m):
+    """El entero con signo más chico que contiene todos los valores"""
+    lo, hi = (int(m.min()), int(m.max())) if m.size else (0, 0)
+    for t in (np.int8, np.int16, np.int32):
+        if np.iinfo(t).min <= lo and hi <= np.iinfo(t).max:
+            return t
+    return np.int64
+
+
+def _cota(m):
+    # En enteros de Python: np.abs desborda en el mínimo del tipo (-2**31 sigue negativo)
+    return max(-int(m.min()), int(m.max())) if m.size else 0
+
+
+def _acumulador_entero(cota):
+    """Tipo entero que no desborda con resultados de hasta `cota`"""
+    for t in (np.int32, np.int64):
+        if cota <= np.iinfo(t).max:
+            return t
+    return object
+
+
+def _enteros(a, b):
+    return (isinstance(a, np.ndarray) and isinstance(b, np.ndarray)
+            and a.dtype.kind in 'iu' and b.dtype.kind in 'iu')
+
+
+def sumar(a, b):
+    if _enteros(a, b):
+        t = _acumulador_entero(_cota(a) + _cota(b))
+        return np.add(a.astype(t), b.astype(t))
+    return a + b
+
+
+def restar(a, b):
+    if _enteros(a, b):
+        t = _acumulador_entero(_cota(a) + _cota(b))
+        return np.subtract(a.astype(t), b.astype(t))
+    return a - b
+
+
+def multiplicar(a, b):
+    """Producto matricial; con enteros acumula sin desbordar"""
+    if _enteros(a, b) and a.ndim >= 2 and b.ndim >= 2 and a.shape[-1] == b.shape[-2]:
+        cota = _cota(a) * _cota(b) * a.shape[-1]
+        t = _acumulador_entero(cota)
+        # float64 representa exactos los enteros < 2**53: se aprovecha BLAS
+        if cota < 2**53:
+            return (a.astype(np.float64) @ b.astype(np.float64)).astype(t)
+        return a.astype(t) @ b.astype(t)
+    return a @ b
+
+
+def mostrar(m):
+    if isinstance(m, np.ndarray) and m.dtype == object:
+        return np.array2string(m, formatter={'object': str})
+    return m
+
+
+def formato_auto(m):
+    """Elige denso o disperso según tamaño y densidad"""
+    if isinstance(m, MatrizDispersa):
+        if m.shape[0] * m.shape[1] < MIN_ELEMENTOS_DISPERSO or m.densidad > UMBRAL_DENSIDAD:
+            return m.toarray()
+        return m
+    m = np.asarray(m)
+    if m.ndim == 2 and m.size >= MIN_ELEMENTOS_DISPERSO:
+        if np.count_nonzero(m) / m.size < UMBRAL_DENSIDAD:
+            return MatrizDispersa.desde_densa(m)
+    return m
+
+
+def leer_dispersa(texto, tipo=None):
+    """Formato disperso 'RxC: i j valor; i j valor' (índices desde 0)"""
+    if tipo == 'exacto':
+        raise ValueError("el modo exacto no admite formato disperso")
+    cabecera, _, cuerpo = texto.partition(':')
+    m, n = map(int, cabecera.lower().split('x'))
+    tripletas = [list(map(float, t.split())) for t in cuerpo.split(';') if t.strip()]
+    if any(len(t) != 3 for t in tripletas):
+        raise ValueError("cada tripleta debe ser 'i j valor'")
+    t = np.array(tripletas).reshape(-1, 3)
+    return MatrizDispersa.desde_coo(t[:, 0].astype(np.int64), t[:, 1].astype(np.int64),
+                                    t[:, 2].astype(TIPOS[tipo or 'float64']), (m, n))
+
+
+def ingresar_matriz(nombre, tipo=None):
     """Función simplificada para ingresar matrices"""
     print(f"\nIngrese la matriz {nombre} (filas separadas por ';' y elementos por espacios):")
     print("Ejemplo: '1 2 3; 4 5 6' para una matriz 2x3")
+    print("Disperso: '1000x1000: 0 0 1.5; 20 7 -2' (tripletas 'i j valor')")
     while True:
         try:
-            datos = input(f"Matriz {nombre}: ").split(';')
-            matriz = [list(map(float, fila.split())) for fila in datos]
-            return np.array(matriz)
-        except ValueError:
-            print("Error: Formato incorrecto. Intente nuevamente.")
+            texto = input(f"Matriz {nombre}: ")
+            if ':' in texto:
+                return formato_auto(leer_dispersa(texto, tipo))
+            datos = texto.split(';')
+            matriz = [fila.split() for fila in datos]
+            return formato_auto(convertir(matriz, tipo))
+        except ValueError as e:
+            print(f"Error: Formato incorrecto ({e}). Intente nuevamente.")
+
+
+def benchmark_dispersa(n=10_000, densidad=0.001, semilla=0):
+    """Mide memoria y tiempo de +, -, @ y .T en disperso frente a denso"""
+    rng = np.random.default_rng(semilla)
+    ops = {simbolo: OPS[k][1] for k, simbolo in zip('1234', SIMBOLOS)}
+
+    def medir(n):
+        nnz = int(n * n * densidad)
+        A, B = (MatrizDispersa.desde_coo(
+            rng.integers(0, n, nnz), rng.integers(0, n, nnz), rng.random(nnz), (n, n)) for _ in range(2))
+        print(f"{n}x{n}, densidad {densidad:.2%}")
+        print(f"Memoria dispersa: {A.nbytes / 2**20:.1f} MiB por matriz")
+        print(f"Memoria densa:    {n * n * 8 / 2**20:.1f} MiB por matriz")
+        for simbolo, f in ops.items():
+            t0 = time.perf_counter()
+            f(A, B)
+            print(f"  disperso {simbolo:>2}: {time.perf_counter() - t0:.4f} s")
+        # Denso solo si cabe con holgura (3 matrices de n*n float64 < 1 GiB)
+        if 3 * n * n * 8 >= 2**30:
+            return False
+        Ad, Bd = A.toarray(), B.toarray()
+        for simbolo, f in ops.items():
+            t0 = time.perf_counter()
+            f(Ad, Bd)
+            print(f"  denso    {simbolo:>2}: {time.perf_counter() - t0:.4f} s")
+        return True
+
+    if not medir(n):
+        # Comparación en el mayor tamaño que sí cabe, con la misma densidad
+        n_denso = int((2**30 / 24) ** 0.5) // 1000 * 1000
+        print(f"  denso: no cabe a {n}x{n}; se compara a {n_denso}x{n_denso}\n")
+        medir(n_denso)
+
+
+class CacheResultados:
+    """
+    Caché LRU direccionada por contenido: la clave es un hash de los bytes,
+    forma y dtype de cada operando más la operación. Desaloja por tamaño
+    hasta respetar el presupuesto y, si tiene directorio, persiste en disco
+    (también LRU, con su propio presupuesto).
+    """
+
+    # Lo que cuesta una entrada aparte de sus datos: así los escalares
+    # (p. ej. un determinante) también cuentan contra el presupuesto
+    SOBRECOSTO = 256
+
+    def __init__(self, presupuesto=256 * 2**20, directorio=None, presupuesto_disco=None):
+        self.presupuesto = presupuesto
+        self.directorio = directorio
+        self.presupuesto_disco = presupuesto_disco or 4 * presupuesto
+        self._datos = OrderedDict()
+        self._disco = OrderedDict()  # nombre de archivo -> bytes, del más viejo al más nuevo
+        self.bytes = 0
+        self.bytes_disco = 0
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self.desalojos = 0
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+            archivos = [e for e in os.scandir(directorio)
+                        if e.is_file() and e.name.endswith((".npy", ".npz"))]
+            for e in sorted(archivos, key=lambda e: e.stat().st_mtime):
+                self._disco[e.name] = e.stat().st_size
+                self.bytes_disco += e.stat().st_size
+            self._recortar_disco()
+
+    @classmethod
+    def _tamano(cls, m):
+        datos = m.nbytes if isinstance(m, (np.ndarray, np.generic, MatrizDispersa, FactorLU)) else sys.getsizeof(m)
+        return cls.SOBRECOSTO + datos
+
+    @staticmethod
+    def clave(operacion, *operandos):
+        """Hash de contenido; None si algún operando no es hasheable (p. ej. Fraction)"""
+        h = hashlib.blake2b(operacion.encode(), digest_size=16)
+        for m in operandos:
+            if m is None:
+                h.update(b"-")
+                continue
+            partes = (("d", m.datos), ("i", m.indices), ("p", m.indptr)) if isinstance(m, MatrizDispersa) else (("n", m),)
+            h.update(repr(m.shape).encode())
+            for etiqueta, arr in partes:
+                if not isinstance(arr, np.ndarray) or arr.dtype == object:
+                    return None
+                h.update(f"{etiqueta}{arr.dtype.str}{arr.shape}".encode())
+                h.update(np.ascontiguousarray(arr).data)
+        return h.hexdigest()
+
+    def _ruta(self, clave, disperso):
+        return os.path.join(self.directorio, clave + (".npz" if disperso else ".npy"))
+
+    def _leer_disco(self, clave):
+        if not self.directorio:
+            return None
+        for disperso in (False, True):
+            ruta = self._ruta(clave, disperso)
+            if not os.path.exists(ruta):
+                continue
+            try:
+                if disperso:
+                    with np.load(ruta) as z:
+                        m = MatrizDispersa(z["indptr"], z["indices"], z["datos"], tuple(z["shape"]))
+                else:
+                    m = np.load(ruta)
+            except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+                # Archivo dañado (p. ej. un corte a mitad de escritura): es un fallo
+                self._borrar_disco(os.path.basename(ruta))
+                return None
+            nombre = os.path.basename(ruta)
+            if nombre in self._disco:
+                self._disco.move_to_end(nombre)
+            os.utime(ruta)
+            return m
+        return None
+
+    def _borrar_disco(self, nombre):
+        self.bytes_disco -= self._disco.pop(nombre, 0)
+        try:
+            os.remove(os.path.join(self.directorio, nombre))
+        except FileNotFoundError:
+            pass
+
+    def _recortar_disco(self):
+        while self._disco and self.bytes_disco > self.presupuesto_disco:
+            self._borrar_disco(next(iter(self._disco)))
+
+    def _escribir_disco(self, clave, m):
+        if not self.directorio:
+            return
+        disperso = isinstance(m, MatrizDispersa)
+        if not disperso and not (isinstance(m, np.ndarray) and m.dtype != object):
+            return
+        ruta = self._ruta(clave, disperso)
+        # Temporal + os.replace: un corte nunca deja un archivo a medias
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directorio)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if disperso:
+                    np.savez(f, indptr=m.indptr, indices=m.indices, datos=m.datos, shape=np.array(m.shape))
+                else:
+                    np.save(f, m)
+            os.replace(tmp, ruta)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        nombre = os.path.basename(ruta)
+        self.bytes_disco -= self._disco.pop(nombre, 0)
+        self._disco[nombre] = os.path.getsize(ruta)
+        self.bytes_disco += self._disco[nombre]
+        self._recortar_disco()
+
+    def _guardar(self, clave, m):
+        tam = self._tamano(m)
+        if tam > self.presupuesto:
+            return
+        while self._datos and self.bytes + tam > self.presupuesto:
+            _, viejo = self._datos.popitem(last=False)
+            self.bytes -= self._tamano(viejo)
+            self.desalojos += 1
+        self._datos[clave] = m
+        self.bytes += tam
+
+    @staticmethod
+    def _congelar(m):
+        # Los resultados se comparten entre aciertos: nadie debe mutarlos
+        for arr in (m.indptr, m.indices, m.datos) if isinstance(m, MatrizDispersa) else (m,):
+            if isinstance(arr, np.ndarray):
+                arr.flags.writeable = False
+        return m
+
+    def calcular(self, operacion, funcion, a, b=None):
+        clave = self.clave(operacion, a, b)
+        if clave is None:
+            return funcion(a, b)
+        if clave in self._datos:
+            self.aciertos += 1
+            self._datos.move_to_end(clave)
+            return self._datos[clave]
+        m = self._leer_disco(clave)
+        if m is not None:
+            self.aciertos_disco += 1
+        else:
+            self.fallos += 1
+            m = funcion(a, b)
+            self._escribir_disco(clave, m)
+        self._guardar(clave, self._congelar(m))
+        return m
+
+    def resumen(self):
+        return (f"Caché: {len(self._datos)} resultados, {self.bytes / 2**20:.1f}/"
+                f"{self.presupuesto / 2**20:.0f} MiB | aciertos {self.aciertos} "
+                f"(disco {self.aciertos_disco}) | fallos {self.fallos} | desalojos {self.desalojos}"
+                + (f" | disco {self.bytes_disco / 2**20:.1f}/{self.presupuesto_disco / 2**20:.0f} MiB"
+                   if self.directorio else ""))
+
+
+class MatrizSingular(ValueError):
+    """La matriz no tiene inversa, exacta o numéricamente"""
+
+
+class FactorLU:
+    """
+    Factorización PA = LU con pivoteo parcial (L y U en una sola matriz).
+    Factorizar cuesta O(n³); cada resolución posterior, O(n²) por columna.
+    En flotantes, un pivote <= eps * n * max|A| marca la matriz como
+    casi singular: resolver e invertir se niegan en vez de devolver basura.
+    """
+
+    def __init__(self, a):
+        if isinstance(a, MatrizDispersa):
+            a = a.toarray()
+        a = np.asarray(a)
+        if a.ndim != 2 or a.shape[0] != a.shape[1]:
+            raise ValueError(f"se necesita una matriz cuadrada, llegó {a.shape}")
+        tipo = a.dtype if a.dtype in (np.float32, np.float64, object) else np.float64
+        lu = a.astype(tipo)
+        n = lu.shape[0]
+        piv = np.arange(n)
+        signo = 1
+        self.singular = False
+        self.casi_singular = False
+        # Fraction es exacta: solo el cero cuenta como pivote nulo
+        tol = 0 if tipo == object or not n else np.finfo(tipo).eps * n * float(np.abs(lu).max())
+        self.pivote_min = None
+        for k in range(n):
+            p = k + int(np.argmax(np.abs(lu[k:, k])))
+            if lu[p, k] == 0:
+                self.singular = True
+                continue
+            if abs(lu[p, k]) <= tol:
+                self.casi_singular = True
+            if self.pivote_min is None or abs(lu[p, k]) < self.pivote_min:
+                self.pivote_min = abs(lu[p, k])
+            if p != k:
+                lu[[k, p]] = lu[[p, k]]
+                piv[[k, p]] = piv[[p, k]]
+                signo = -signo
+            lu[k + 1:, k] /= lu[k, k]
+            lu[k + 1:, k + 1:] -= np.outer(lu[k + 1:, k], lu[k, k + 1:])
+        self.lu = lu
+        self.piv = piv
+        self.signo = signo
+
+    @property
+    def nbytes(self):
+        return self.lu.nbytes + self.piv.nbytes
+
+    @property
+    def n(self):
+        return self.lu.shape[0]
+
+    def resolver(self, b):
+        """Resuelve A x = b; b puede ser un vector o n×k (k lados derechos a la vez)"""
+        if self.singular:
+            raise MatrizSingular("la matriz es singular")
+        if self.casi_singular:
+            raise MatrizSingular(f"la matriz es casi singular (pivote {float(self.pivote_min):.3g}); "
+                                 "el resultado no sería confiable")
+        if isinstance(b, MatrizDispersa):
+            b = b.toarray()
+        b = np.asarray(b)
+        if b.shape[0] != self.n:
+            raise ValueError(f"formas incompatibles para resolver: {self.lu.shape} y {b.shape}")
+        lu = self.lu
+        x = b[self.piv].astype(np.result_type(lu, b))
+        for i in range(1, self.n):
+            x[i] -= lu[i, :i] @ x[:i]
+        for i in range(self.n - 1, -1, -1):
+            x[i] = (x[i] - lu[i, i + 1:] @ x[i + 1:]) / lu[i, i]
+        return x
+
+    def determinante(self):
+        if self.singular:
+            return self.lu.dtype.type(0) if self.lu.dtype != object else 0
+        return self.signo * np.prod(np.diag(self.lu))
+
+    def inversa(self):
+        return self.resolver(np.eye(self.n, dtype=self.lu.dtype))
+
+
+CACHE = CacheResultados()
+# Factorizaciones por contenido de A: resolver contra otro B no refactoriza
+FACTORES = CacheResultados(presupuesto=64 * 2**20)
+
+
+def factorizar(a):
+    return FACTORES.calcular("lu", lambda m, _: FactorLU(m), a)
+
+
+def resolver(a, b):
+    return factorizar(a).resolver(b)
+
 
-def main():
+def inversa(a):
+    return factorizar(a).inversa()
+
+
+def determinante(a):
+    return factorizar(a).determinante()
+
+
+OPS = {
+    '1': ('Suma', lambda a, b: sumar(a, b), True),
+    '2': ('Resta ', lambda a, b: restar(a, b), True),
+    '3': ('Multiplicación ', lambda a, b: multiplicar(a, b), True),
+    '4': ('Transposición ', lambda a, _: a.T, False),
+    '5': ('Resolver A x = B', lambda a, b: resolver(a, b), True),
+    '6': ('Inversa', lambda a, _: inversa(a), False),
+    '7': ('Determinante', lambda a, _: determinante(a), False),
+
+    '8': ('Modo lote (archivos .npy)', lambda: modo_lote(), None),
+    '9': ('Estadísticas de caché', lambda: print(CACHE.resumen() + "\n" + FACTORES.resumen()), None),
+    '10': ('Salir', None, False)
+}
+
+# Nombre estable de cada operación para la caché: no depende del número de menú
+CLAVES_CACHE = {
+    '1': 'suma', '2': 'resta', '3': 'multiplicacion', '4': 'transpuesta',
+    '5': 'resolver', '6': 'inversa', '7': 'determinante',
+}
+
+
+class ErrorLote(ValueError):
+    """Error de forma con el detalle de cada elemento del lote que falla"""
+
+    def __init__(self, errores):
+        self.errores = errores  # lista de (índice, mensaje)
+        detalle = "; ".join(f"[{i}] {msg}" for i, msg in errores[:10])
+        extra = f" (y {len(errores) - 10} más)" if len(errores) > 10 else ""
+        super().__init__(f"{len(errores)} elemento(s) con forma inválida: {detalle}{extra}")
+
+
+# Operaciones de lote: el mismo cálculo sobre toda la pila en una llamada
+OPS_LOTE = {
+    '+': (sumar, True),
+    '-': (restar, True),
+    '@': (multiplicar, True),
+    '.T': (lambda a, _: np.swapaxes(a, -1, -2), False),
+}
+SIMBOLOS = list(OPS_LOTE)
+
+
+def apilar(matrices, nombre="A"):
+    """Convierte una lista de matrices (o un arreglo) en una pila N×r×c"""
+    if isinstance(matrices, np.ndarray):
+        if matrices.ndim == 2:
+            return matrices[None]
+        if matrices.ndim != 3:
+            raise ValueError(f"{nombre}: se esperaba un arreglo N×r×c, llegó {matrices.shape}")
+        return matrices
+    matrices = [np.asarray(m) for m in matrices]
+    if not matrices:
+        raise ValueError(f"{nombre}: el lote está vacío")
+    forma = matrices[0].shape
+    errores = [(i, f"{nombre} tiene forma {m.shape}, se esperaba {forma}")
+               for i, m in enumerate(matrices) if m.shape != forma or m.ndim != 2]
+    if errores:
+        raise ErrorLote(errores)
+    return np.stack(matrices)
+
+
+def operar_lote(simbolo, A, B=None):
+    """
+    Aplica `simbolo` a cada par (A[i], B[i]). B puede ser una sola matriz
+    que se reutiliza para todo el lote.
+    """
+    funcion, binaria = OPS_LOTE[simbolo]
+    if binaria and isinstance(A, (list, tuple)) and isinstance(B, (list, tuple)):
+        # Listas sueltas: se valida par a par para señalar cada elemento malo
+        if len(A) != len(B):
+            raise ValueError(f"lotes de distinto tamaño: A tiene {len(A)}, B tiene {len(B)}")
+        errores = []
+        for i, (a, b) in enumerate(zip(A, B)):
+            fa, fb = np.shape(a), np.shape(b)
+            ok = len(fa) == len(fb) == 2 and (fa[1] == fb[0] if simbolo == '@' else fa == fb)
+            if not ok:
+                errores.append((i, f"{fa} {simbolo} {fb} incompatibles"))
+        if errores:
+            raise ErrorLote(errores)
+    A = apilar(A, "A")
+    if not binaria:
+        return funcion(A, None)
+    B = np.asarray(B) if isinstance(B, np.ndarray) and B.ndim == 2 else apilar(B, "B")
+    if B.ndim == 3 and B.shape[0] not in (1, A.shape[0]):
+        raise ValueError(f"lotes de distinto tamaño: A tiene {A.shape[0]}, B tiene {B.shape[0]}")
+    fa, fb = A.shape[-2:], B.shape[-2:]
+    ok = fa[1] == fb[0] if simbolo == '@' else fa == fb
+    if not ok:
+        n = A.shape[0]
+        raise ErrorLote([(i, f"{fa} {simbolo} {fb} incompatibles") for i in range(n)])
+    return funcion(A, B)
+
+
+def modo_lote():
+    """Opera pilas N×r×c guardadas en archivos .npy"""
+    try:
+        simbolo = input(f"Operación ({', '.join(SIMBOLOS)}): ").strip()
+        if simbolo not in OPS_LOTE:
+            print("Operación no válida")
+            return
+        A = np.load(input("Archivo .npy de A: ").strip())
+        B = np.load(input("Archivo .npy de B: ").strip()) if OPS_LOTE[simbolo][1] else None
+        t0 = time.perf_counter()
+        resultado = CACHE.calcular("lote" + simbolo, lambda a, b: operar_lote(simbolo, a, b), A, B)
+        dt = time.perf_counter() - t0
+        destino = input("Guardar resultado en (.npy): ").strip() or "resultado_lote.npy"
+        np.save(destino, resultado)
+        print(f"{resultado.shape[0]} resultados de forma {resultado.shape[1:]} en {dt:.4f} s -> {destino}")
+    except ErrorLote as e:
+        for i, msg in e.errores[:20]:
+            print(f"  Elemento {i}: {msg}")
+        if len(e.errores) > 20:
+            print(f"  ... y {len(e.errores) - 20} más")
+    except ValueError as e:
+        print(f"Error en dimensiones: {e}")
+    except OSError as e:
+        print(f"Error de archivo: {e}")
+
+
+def benchmark_lote(n=200_000, tam=3, semilla=0):
+    """Compara operar_lote contra recorrer las lambdas de OPS una a una"""
+    rng = np.random.default_rng(semilla)
+    A = rng.random((n, tam, tam))
+    B = rng.random((n, tam, tam))
+    print(f"{n} matrices {tam}x{tam}")
+    for k, simbolo in zip('1234', SIMBOLOS):
+        f = OPS[k][1]
+        t0 = time.perf_counter()
+        for i in range(n):
+            f(A[i], B[i])
+        bucle = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        operar_lote(simbolo, A, B)
+        lote = time.perf_counter() - t0
+        print(f"  {simbolo:>2}: bucle {bucle:.3f} s | lote {lote:.4f} s | x{bucle / lote:.0f}")
+
+
+def benchmark_tipos(n=1500, semilla=0):
+    """Producto n×n en float64, float32 y enteros pequeños"""
+    rng = np.random.default_rng(semilla)
+    a = rng.random((n, n))
+    e = rng.integers(-100, 100, (n, n)).astype(np.int8)
+    casos = [
+        ('float64', a, a.copy(), lambda x, y: x @ y),
+        ('float32', a.astype(np.float32), a.astype(np.float32), lambda x, y: x @ y),
+        ('int8 (acumulación segura)', e, e.copy(), multiplicar),
+        ('int64 sin ruta rápida', e.astype(np.int64), e.astype(np.int64), lambda x, y: x @ y),
+    ]
+    print(f"Producto {n}x{n}")
+    for nombre, x, y, f in casos:
+        t0 = time.perf_counter()
+        r = f(x, y)
+        dt = time.perf_counter() - t0
+        print(f"  {nombre:<27} {dt:.3f} s | operando {x.nbytes / 2**20:.1f} MiB | resultado {r.dtype}")
+
+
+def benchmark_lu(n=500, resoluciones=50, semilla=0):
+    """Muchas resoluciones con la misma A: factorización reutilizada frente a desde cero"""
+    rng = np.random.default_rng(semilla)
+    A = rng.random((n, n)) + n * np.eye(n)
+    bs = [rng.random(n) for _ in range(resoluciones)]
+    t0 = time.perf_counter()
+    for b in bs:
+        FactorLU(A).resolver(b)
+    sin_reuso = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for b in bs:
+        resolver(A, b)
+    con_reuso = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    resolver(A, np.column_stack(bs))
+    lote = time.perf_counter() - t0
+    print(f"{resoluciones} resoluciones {n}x{n}")
+    print(f"  refactorizando cada vez: {sin_reuso:.3f} s")
+    print(f"  reutilizando LU:         {con_reuso:.3f} s")
+    print(f"  un solo B de {resoluciones} columnas: {lote:.3f} s")
+
+
+BENCHMARKS = {
+    'dispersa': benchmark_dispersa,
+    'lote': benchmark_lote,
+    'tipos': benchmark_tipos,
+    'lu': benchmark_lu,
+}
+
+
+def main(tipo=None):
     print("Calculadora Matricial Simplificada")
-    ops = {
-        '1': ('Suma', lambda a, b: a + b, True),
-        '2': ('Resta ', lambda a, b: a - b, True),
-        '3': ('Multiplicación ', lambda a, b: a @ b, True),
-        '4': ('Transposición ', lambda a, _: a.T, False),
-    
-        '5': ('Salir', None, False)
-    }
+    if tipo:
+        print(f"Tipo de datos: {tipo}")
+    ops = OPS
     
     while True:
         print("\nOperaciones disponibles:")
         for i, j in ops.items():
             print(f"{i}. {j[0]}")
         
-        op = input("Seleccione (1-5): ")
+        op = input(f"Seleccione (1-{len(ops)}): ")
         
-        if op == '5':
+        if op in ops and ops[op][0] == 'Salir':
             print("¡Hasta luego!")
             break
             
         if op not in ops:
             print("Opción no válida")
             continue
+
+        if ops[op][2] is None:
+            ops[op][1]()
+            continue
             
         try:
             if ops[op][2]: 
-                A = ingresar_matriz("A")
-                B = ingresar_matriz("B")
-                resultado = ops[op][1](A, B)
+                A = ingresar_matriz("A", tipo)
+                B = ingresar_matriz("B", tipo)
+                resultado = CACHE.calcular(CLAVES_CACHE[op], lambda a, b: formato_auto(ops[op][1](a, b)), A, B)
             else:  
-                A = ingresar_matriz("A")
-                resultado = ops[op][1](A, None)
+                A = ingresar_matriz("A", tipo)
+                resultado = CACHE.calcular(CLAVES_CACHE[op], lambda a, _: formato_auto(ops[op][1](a, None)), A)
                 
             print("\nResultado:")
-            print(resultado)
+            print(mostrar(resultado))
             
+        except MatrizSingular as e:
+            print(f"Error: {e}")
         except ValueError as e:
             print(f"Error en dimensiones: {e}")
         except Exception as e:
             print(f"Error inesperado: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if "--bench" in sys.argv:
+        # --bench corre todos; --bench <nombre> solo ese
+        pedidos = [a for a in sys.argv[sys.argv.index("--bench") + 1:] if a in BENCHMARKS]
+        for nombre in pedidos or BENCHMARKS:
+            print(f"\n== {nombre} ==")
+            BENCHMARKS[nombre]()
+    else:
+        tipo = None
+        if "--dtype" in sys.argv:
+            tipo = sys.argv[sys.argv.index("--dtype") + 1]
+            if tipo not in TIPOS:
+                sys.exit(f"--dtype debe ser uno de: {', '.join(TIPOS)}")
+        if "--cache-mb" in sys.argv or "--cache-dir" in sys.argv:
+            mb = float(sys.argv[sys.argv.index("--cache-mb") + 1]) if "--cache-mb" in sys.argv else 256
+            directorio = sys.argv[sys.argv.index("--cache-dir") + 1] if "--cache-dir" in sys.argv else None
+            CACHE = CacheResultados(int(mb * 2**20), directorio)
+        main(tipo)
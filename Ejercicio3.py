@@ -1,7 +1,12 @@
+from indice_trigramas import IndiceTrigramas
+
 estudiantes = {
     "A001": {"nombre": "Maria", "edad": 23, "calificaciones": [90, 85, 78]},
     "A002": {"nombre": "Lucero", "edad": 22, "calificaciones": [88, 91, 79]}
 }
+indice = IndiceTrigramas()
+for id_est, info in estudiantes.items():
+    indice.agregar(id_est, info["nombre"])
 
 def agregar():
     id_est = input("ID: ").upper()
@@ -11,6 +16,7 @@ def agregar():
     edad = int(input("Edad: "))
     notas = list(map(float, input("Calificaciones (coma): ").split(",")))
     estudiantes[id_est] = {"nombre": nombre, "edad": edad, "calificaciones": notas}
+    indice.agregar(id_est, nombre)
 
 def mostrar():
     for id_est, info in estudiantes.items():
@@ -27,14 +33,21 @@ def promedio():
 
 def eliminar():
     id_est = input("ID: ").upper()
-    if id_est in estudiantes: del estudiantes[id_est]; print("Eliminado")
+    if id_est in estudiantes: del estudiantes[id_est]; indice.eliminar(id_est); print("Eliminado")
     else: print("No encontrado")
 
+def buscar():
+    resultados = indice.buscar(input("Nombre (parcial o aproximado): "))
+    if not resultados: print("Sin coincidencias"); return
+    for id_est, similitud in resultados:
+        print(f"{id_est} - {estudiantes[id_est]['nombre']} ({similitud:.0%})")
+
 while True:
-    op = input("\n1.Agregar 2.Mostrar 3.Promedio 4.Eliminar 5.Salir: ")
+    op = input("\n1.Agregar 2.Mostrar 3.Promedio 4.Eliminar 5.Buscar 6.Salir: ")
     if op=="1": agregar()
     elif op=="2": mostrar()
     elif op=="3": promedio()
     elif op=="4": eliminar()
-    elif op=="5": break
+    elif op=="5": buscar()
+    elif op=="6": break
     else: print("Opción inválida")
\ No newline at end of file
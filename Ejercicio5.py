@@ -1,3 +1,14 @@
+import heapq
+import os
+import shutil
+import tempfile
+from itertools import groupby
+
+from indice_trigramas import IndiceTrigramas
+
+# Índice de nombres; se arma al primer uso y luego se mantiene al agregar
+indice = None
+registros = []
 
 def leer_estudiantes():
 
@@ -67,6 +78,10 @@ def agregar_estudiante():
         with open("estudiantes.txt", "a") as archivo:
             archivo.write(f"{nombre},{calificacion}\n")
         
+        if indice is not None:
+            registros.append((nombre, calificacion))
+            indice.agregar(len(registros) - 1, nombre)
+        
         print(f"Estudiante {nombre} agregado correctamente")
     
     except ValueError:
@@ -74,6 +89,163 @@ def agregar_estudiante():
     except Exception as e:
         print(f"Error al agregar estudiante: {e}")
 
+def buscar_estudiante():
+    global indice, registros
+    if indice is None:
+        registros = leer_estudiantes()
+        indice = IndiceTrigramas()
+        for i, (nombre, _) in enumerate(registros):
+            indice.agregar(i, nombre)
+    
+    consulta = input("Nombre (parcial o aproximado): ").strip()
+    resultados = indice.buscar(consulta)
+    if not resultados:
+        print("Sin coincidencias")
+        return
+    
+    for i, similitud in resultados:
+        nombre, calificacion = registros[i]
+        print(f"{nombre}: {calificacion} ({similitud:.0%})")
+
+# Registros por corrida del ordenamiento externo y archivos abiertos a la vez
+TAM_CORRIDA = 200000
+MAX_ABIERTOS = 64
+
+def leer_registros(ruta, verificar_orden=False):
+    """Genera (nombre, calificacion) línea a línea, sin cargar el archivo"""
+    anterior = None
+    with open(ruta, "r") as archivo:
+        for linea in archivo:
+            linea = linea.strip()
+            if not linea or ',' not in linea:
+                continue
+            nombre, calificacion = linea.split(',', 1)
+            try:
+                calificacion = float(calificacion)
+            except ValueError:
+                print(f"Error: Calificación no válida para {nombre} en {ruta}")
+                continue
+            if verificar_orden:
+                if anterior is not None and nombre < anterior:
+                    raise ValueError(f"{ruta} no está ordenado por nombre ({nombre} después de {anterior})")
+                anterior = nombre
+            yield nombre, calificacion
+
+def _escribir_corrida(registros, directorio):
+    fd, ruta = tempfile.mkstemp(suffix=".txt", dir=directorio)
+    with os.fdopen(fd, "w") as archivo:
+        for nombre, calificacion in registros:
+            archivo.write(f"{nombre},{calificacion}\n")
+    return ruta
+
+def ordenar_externo(ruta, directorio, tam_corrida=TAM_CORRIDA):
+    """Parte el archivo en corridas ordenadas de tam_corrida registros"""
+    corridas = []
+    bloque = []
+    for registro in leer_registros(ruta):
+        bloque.append(registro)
+        if len(bloque) >= tam_corrida:
+            bloque.sort()
+            corridas.append(_escribir_corrida(bloque, directorio))
+            bloque = []
+    if bloque:
+        bloque.sort()
+        corridas.append(_escribir_corrida(bloque, directorio))
+    return corridas
+
+def _por_nombre(registro):
+    return registro[0]
+
+def _reducir(rutas, directorio, temporales):
+    """Fusiona por tandas hasta que quepan MAX_ABIERTOS archivos abiertos"""
+    while len(rutas) > MAX_ABIERTOS:
+        siguientes = []
+        for i in range(0, len(rutas), MAX_ABIERTOS):
+            tanda = rutas[i:i + MAX_ABIERTOS]
+            if len(tanda) == 1:
+                siguientes.extend(tanda)
+                continue
+            # En la primera pasada son los archivos del usuario: el error
+            # de orden debe nombrar el archivo original
+            fusion = heapq.merge(*(leer_registros(r, verificar_orden=True) for r in tanda), key=_por_nombre)
+            nueva = _escribir_corrida(fusion, directorio)
+            temporales.append(nueva)
+            siguientes.append(nueva)
+        rutas = siguientes
+    return rutas
+
+def combinar_archivos(rutas, salida="reporte_combinado.txt", ordenar=False, tam_corrida=TAM_CORRIDA,
+                      directorio_temporal=None):
+    """
+    Fusión de k vías de archivos ordenados por nombre: una sola pasada,
+    memoria acotada por la cantidad de archivos. Con ordenar=True cada
+    entrada se ordena antes en corridas temporales (ordenamiento externo).
+    Las corridas van junto a la salida salvo que se indique otro directorio:
+    el temporal del sistema suele estar en RAM (tmpfs).
+    Devuelve (estudiantes, notas, promedio general).
+    """
+    temporales = []
+    base = directorio_temporal or os.path.dirname(os.path.abspath(salida))
+    directorio = tempfile.mkdtemp(prefix=".notas_", dir=base)
+    try:
+        if ordenar:
+            for ruta in rutas:
+                temporales.extend(ordenar_externo(ruta, directorio, tam_corrida))
+            rutas = temporales
+        rutas = _reducir(list(rutas), directorio, temporales)
+        
+        fusion = heapq.merge(*(leer_registros(r, verificar_orden=True) for r in rutas), key=_por_nombre)
+        estudiantes = notas = 0
+        total = 0.0
+        # Se escribe a un temporal junto a la salida y se reemplaza solo al
+        # terminar: un error a mitad no deja un reporte parcial
+        fd, temporal = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(salida)))
+        temporales.append(temporal)
+        with os.fdopen(fd, "w") as archivo:
+            for nombre, grupo in groupby(fusion, key=_por_nombre):
+                suma = n = 0
+                for _, calificacion in grupo:
+                    suma += calificacion
+                    n += 1
+                archivo.write(f"{nombre},{suma / n:.1f}\n")
+                estudiantes += 1
+                notas += n
+                total += suma
+            
+            promedio = total / notas if notas else 0
+            archivo.write(f"Promedio general: {promedio:.1f}")
+        os.replace(temporal, salida)
+        temporales.remove(temporal)
+        return estudiantes, notas, promedio
+    finally:
+        for ruta in temporales:
+            if os.path.exists(ruta):
+                os.remove(ruta)
+        # Incluye la corrida a medio escribir si la fusión falló
+        shutil.rmtree(directorio, ignore_errors=True)
+
+def combinar_notas():
+    
+    try:
+        rutas = [r.strip() for r in input("Archivos de notas (separados por coma): ").split(",") if r.strip()]
+        if not rutas:
+            print("Debe indicar al menos un archivo")
+            return
+        
+        ordenar = input("¿Ordenar antes los archivos? (s/n): ").strip().lower() == "s"
+        salida = input("Archivo de salida [reporte_combinado.txt]: ").strip() or "reporte_combinado.txt"
+        
+        estudiantes, notas, promedio = combinar_archivos(rutas, salida, ordenar)
+        print(f"{estudiantes} estudiantes, {notas} notas. Promedio general: {promedio:.1f}")
+        print(f"Reporte generado en {salida}")
+    
+    except FileNotFoundError as e:
+        print(f"Error: El archivo {e.filename} no existe")
+    except ValueError as e:
+        print(f"Error: {e}. Use la opción de ordenar antes")
+    except Exception as e:
+        print(f"Error al combinar archivos: {e}")
+
 def mostrar_menu():
     """Muestra el menú principal"""
     print("\n" + "="*40)
@@ -83,7 +255,9 @@ def mostrar_menu():
     print("2. Generar reporte completo")
     print("3. Agregar nuevo estudiante")
     print("4. Ver todos los estudiantes")
-    print("5. Salir")
+    print("5. Buscar estudiante por nombre")
+    print("6. Combinar archivos de notas")
+    print("7. Salir")
     print("="*40)
 
 def main():
@@ -126,6 +300,12 @@ def main():
                 print("No hay estudiantes registrados")
         
         elif opcion == "5":
+            buscar_estudiante()
+        
+        elif opcion == "6":
+            combinar_notas()
+        
+        elif opcion == "7":
             print("¡Hasta luego!")
             break
         
@@ -14,10 +14,19 @@ Ejecuta:
     python rpg_culiacan.py
 """
 
+import contextlib
+import heapq
+import io
+import itertools
 import json
 import os
 import random
-from typing import Dict, List, Optional, Tuple
+import sys
+import tempfile
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 # =========================
 # Colores ANSI (sin colorama)
@@ -91,6 +100,16 @@ ACHIEVEMENTS = {
     "jefe_derrotado": "Venciste a un comandante enemigo."
 }
 
+# Reglas declarativas: evento -> [(logro, condición)]. Cada cambio de estado
+# dispara solo su evento, así que solo se evalúan las reglas que le afectan.
+REGLAS_LOGROS = {
+    "nivel": [("nivel_3", lambda j: j.nivel >= 3)],
+    "items": [("coleccionista", lambda j: j.items_total >= 6)],
+    "victoria": [("primer_combo", lambda j: j.victorias >= 1)],
+    "capitulo": [("tres_capitulos", lambda j: j.capitulos_superados >= 3)],
+    "jefe": [("jefe_derrotado", lambda j: j.jefes_derrotados >= 1)],
+}
+
 # =========================
 # Utilidades de E/S
 # =========================
@@ -124,6 +143,35 @@ def ask_choice(prompt: str, options: List[str]) -> int:
 # =========================
 # Modelo Jugador
 # =========================
+# Atributos simples que un punto de control copia tal cual
+_ESTADO_ESCALAR = (
+    "nombre", "rol", "nivel", "xp", "vida", "vida_max", "ataque_min", "ataque_max",
+    "defensa_base", "defensa_bono", "buff_turnos", "chaleco_cargas", "capitulo",
+    "items_total", "victorias", "capitulos_superados", "jefes_derrotados",
+)
+
+class PuntoControl:
+    """
+    Estado congelado de un Jugador. Comparte inventario/logros/arsenal con el
+    jugador que lo creó (solo lectura aquí); quien mute después copia primero.
+    """
+    __slots__ = ("escalares", "_inventario", "_logros", "_arsenal")
+
+    def __init__(self, escalares: tuple, inventario: Dict[str, int],
+                 logros: Dict[str, None], arsenal: List[str]):
+        self.escalares = escalares
+        self._inventario = inventario
+        self._logros = logros
+        self._arsenal = arsenal
+
+    @property
+    def inventario(self) -> Mapping[str, int]:
+        return MappingProxyType(self._inventario)
+
+    @property
+    def logros(self) -> Mapping[str, None]:
+        return MappingProxyType(self._logros)
+
 class Jugador:
     def __init__(
         self,
@@ -139,6 +187,9 @@ class Jugador:
         chaleco_cargas: int = 0,
         capitulo: int = 0,
         logros: Optional[List[str]] = None,
+        victorias: int = 0,
+        capitulos_superados: int = 0,
+        jefes_derrotados: int = 0,
     ):
         base = ROLES.get(rol, ROLES["Vecino"])
         self.nombre = nombre
@@ -158,8 +209,21 @@ class Jugador:
         self.buff_turnos = buff_turnos
         self.chaleco_cargas = chaleco_cargas
         self.capitulo = capitulo  # progreso de campaña
-        self.logros = logros[:] if logros else []
-        self._check_achievements_inventory()
+        # dict ordenado usado como conjunto: pertenencia O(1) y orden de obtención
+        self.logros: Dict[str, None] = dict.fromkeys(logros or [])
+        # Contadores incrementales que alimentan REGLAS_LOGROS
+        self.items_total = sum(self.inventario.values())
+        self.victorias = victorias
+        self.capitulos_superados = capitulos_superados
+        self.jefes_derrotados = jefes_derrotados
+        # Copia-al-escribir: True si un PuntoControl comparte el dict
+        self._inv_compartido = False
+        self._logros_compartido = False
+        # Clasificación que sigue a este jugador (se asigna al registrarlo)
+        self.tablero: Optional["Clasificacion"] = None
+        # Al cargar se revisan todas las reglas una vez; después, solo por evento
+        for tipo in REGLAS_LOGROS:
+            self.evento(tipo)
 
     # --------- Cálculos de combate ----------
     def tirada_ataque(self) -> int:
@@ -196,27 +260,83 @@ class Jugador:
             self.ataque_min += 1
             self.ataque_max += 2
             print(CLR_G + f"🔼 {self.nombre} sube a nivel {self.nivel}! Vida restaurada." + CLR_RST)
-            if self.nivel >= 3 and "nivel_3" not in self.logros:
-                self.logros.append("nivel_3")
-                print(CLR_G + f"🏅 Logro: {ACHIEVEMENTS['nivel_3']}" + CLR_RST)
+            self.evento("nivel")
+        self.evento("xp")
 
     def add_item(self, clave: str, n: int = 1):
+        self._inv_propio()
         self.inventario[clave] = self.inventario.get(clave, 0) + n
-        self._check_achievements_inventory()
+        self.items_total += n
+        self.evento("items")
 
     def remove_item(self, clave: str, n: int = 1) -> bool:
         if self.inventario.get(clave, 0) >= n:
+            self._inv_propio()
             self.inventario[clave] -= n
+            self.items_total -= n
             if self.inventario[clave] <= 0:
                 del self.inventario[clave]
             return True
         return False
 
-    def _check_achievements_inventory(self):
-        total = sum(self.inventario.values())
-        if total >= 6 and "coleccionista" not in self.logros:
-            self.logros.append("coleccionista")
-            print(CLR_G + f"🏅 Logro: {ACHIEVEMENTS['coleccionista']}" + CLR_RST)
+    # --------- Logros ----------
+    def registrar_victoria(self, enemigo: Dict):
+        self.victorias += 1
+        self.evento("victoria")
+        if enemigo["nombre"].lower().startswith("comandante"):
+            self.jefes_derrotados += 1
+            self.evento("jefe")
+
+    def registrar_capitulo(self):
+        self.capitulos_superados += 1
+        self.evento("capitulo")
+
+    def evento(self, tipo: str):
+        """Evalúa solo las reglas ligadas a `tipo`."""
+        for clave, cond in REGLAS_LOGROS.get(tipo, ()):
+            if clave not in self.logros and cond(self):
+                if self._logros_compartido:
+                    self.logros = dict(self.logros)
+                    self._logros_compartido = False
+                self.logros[clave] = None
+                print(CLR_G + f"🏅 Logro: {ACHIEVEMENTS[clave]}" + CLR_RST)
+        if self.tablero is not None:
+            self.tablero.actualizar(self)
+
+    # --------- Puntos de control ----------
+    def _inv_propio(self):
+        if self._inv_compartido:
+            self.inventario = dict(self.inventario)
+            self._inv_compartido = False
+
+    def checkpoint(self) -> PuntoControl:
+        """O(campos): no copia inventario ni logros, solo los marca compartidos."""
+        self._inv_compartido = True
+        self._logros_compartido = True
+        return PuntoControl(
+            tuple(getattr(self, a) for a in _ESTADO_ESCALAR),
+            self.inventario, self.logros, self.arsenal,
+        )
+
+    def restaurar(self, p: PuntoControl):
+        for a, v in zip(_ESTADO_ESCALAR, p.escalares):
+            setattr(self, a, v)
+        # Se reutilizan los dicts del punto de control; la próxima mutación copia
+        self.inventario = p._inventario
+        self.logros = p._logros
+        self.arsenal = p._arsenal  # el arsenal nunca se muta
+        self._inv_compartido = True
+        self._logros_compartido = True
+        if self.tablero is not None:
+            self.tablero.actualizar(self)
+
+    @staticmethod
+    def desde_checkpoint(p: PuntoControl) -> "Jugador":
+        """Bifurca un jugador nuevo a partir de un punto de control."""
+        j = Jugador.__new__(Jugador)
+        j.tablero = None
+        j.restaurar(p)
+        return j
 
     # --------- Serialización ----------
     def to_dict(self) -> dict:
@@ -231,12 +351,15 @@ class Jugador:
             "ataque_max": self.ataque_max,
             "defensa_base": self.defensa_base,
             "defensa_bono": self.defensa_bono,
-            "arsenal": self.arsenal,
-            "inventario": self.inventario,
+            "arsenal": list(self.arsenal),
+            "inventario": dict(self.inventario),
             "buff_turnos": self.buff_turnos,
             "chaleco_cargas": self.chaleco_cargas,
             "capitulo": self.capitulo,
-            "logros": self.logros,
+            "logros": list(self.logros),
+            "victorias": self.victorias,
+            "capitulos_superados": self.capitulos_superados,
+            "jefes_derrotados": self.jefes_derrotados,
         }
 
     @staticmethod
@@ -254,6 +377,10 @@ class Jugador:
             chaleco_cargas=d.get("chaleco_cargas", 0),
             capitulo=d.get("capitulo", 0),
             logros=d.get("logros", []),
+            # Partidas antiguas: cada capítulo alcanzado fue una victoria
+            victorias=d.get("victorias", d.get("capitulo", 0)),
+            capitulos_superados=d.get("capitulos_superados", d.get("capitulo", 0)),
+            jefes_derrotados=d.get("jefes_derrotados", 0),
         )
         # Reasignar valores si existen para compatibilidad
         j.vida_max = d.get("vida_max", j.vida_max)
@@ -262,13 +389,223 @@ class Jugador:
         j.defensa_base = d.get("defensa_base", j.defensa_base)
         return j
 
+# =========================
+# Clasificación y estadísticas
+# =========================
+RANKING_FILE = "clasificacion.json"
+TOP_PERSISTIDO = 10
+
+def puntuacion(j: Jugador) -> int:
+    # XP acumulada en toda la partida; el capítulo desempata (caben 16)
+    return ((j.nivel - 1) * 100 + max(0, j.xp)) * 16 + j.capitulo
+
+class _NodoConteo:
+    __slots__ = ("clave", "prioridad", "cuenta", "tam", "izq", "der")
+
+    def __init__(self, clave: int, prioridad: float):
+        self.clave = clave
+        self.prioridad = prioridad
+        self.cuenta = 0
+        self.tam = 0
+        self.izq: Optional["_NodoConteo"] = None
+        self.der: Optional["_NodoConteo"] = None
+
+def _tam(n: Optional[_NodoConteo]) -> int:
+    return n.tam if n else 0
+
+class _ArbolConteos:
+    """
+    Conteos por puntuación en un treap con tamaños de subárbol: un nodo por
+    puntuación distinta, así que el tamaño sigue al número de jugadores y
+    no a la XP más alta. Operaciones en O(log N) esperado.
+    """
+
+    def __init__(self):
+        self.raiz: Optional[_NodoConteo] = None
+        self.total = 0
+        self._rng = random.Random()
+
+    @staticmethod
+    def _fijar(n: _NodoConteo) -> _NodoConteo:
+        n.tam = _tam(n.izq) + n.cuenta + _tam(n.der)
+        return n
+
+    def _partir(self, n: Optional[_NodoConteo], clave: int):
+        """(claves < clave, claves >= clave)"""
+        if n is None:
+            return None, None
+        if n.clave < clave:
+            n.der, der = self._partir(n.der, clave)
+            return self._fijar(n), der
+        izq, n.izq = self._partir(n.izq, clave)
+        return izq, self._fijar(n)
+
+    def _unir(self, a: Optional[_NodoConteo], b: Optional[_NodoConteo]):
+        if a is None or b is None:
+            return a or b
+        if a.prioridad > b.prioridad:
+            a.der = self._unir(a.der, b)
+            return self._fijar(a)
+        b.izq = self._unir(a, b.izq)
+        return self._fijar(b)
+
+    def sumar(self, clave: int, d: int):
+        self.total += d
+        izq, resto = self._partir(self.raiz, clave)
+        nodo, der = self._partir(resto, clave + 1)
+        if nodo is None:
+            nodo = _NodoConteo(clave, self._rng.random())
+        nodo.cuenta += d
+        nodo = self._fijar(nodo) if nodo.cuenta else None
+        self.raiz = self._unir(self._unir(izq, nodo), der)
+
+    def prefijo(self, clave: int) -> int:
+        """Cantidad de puntuaciones <= clave."""
+        s, n = 0, self.raiz
+        while n:
+            if clave < n.clave:
+                n = n.izq
+            else:
+                s += _tam(n.izq) + n.cuenta
+                n = n.der
+        return s
+
+    def kesimo(self, k: int) -> int:
+        """Menor puntuación cuyo prefijo alcanza k (1-indexado)."""
+        n = self.raiz
+        while n:
+            t = _tam(n.izq)
+            if k <= t:
+                n = n.izq
+            elif k <= t + n.cuenta:
+                return n.clave
+            else:
+                k -= t + n.cuenta
+                n = n.der
+        raise IndexError(k)
+
+class Clasificacion:
+    """
+    Ranking y estadísticas por rol mantenidos al vuelo: cada cambio de un
+    jugador registrado mueve solo su entrada. Top-N y puesto en O(log N)
+    (más N para listar), agregados por rol y por nivel en O(1).
+    """
+
+    def __init__(self, jugadores: Optional[List[Jugador]] = None):
+        self._arbol = _ArbolConteos()
+        self._cubetas: Dict[int, Dict[int, Jugador]] = {}
+        self._estado: Dict[int, Tuple[int, str, int, bool]] = {}
+        self.por_rol: Dict[str, Dict[str, int]] = {}
+        self.por_nivel: Dict[int, int] = {}
+        for j in jugadores or []:
+            self.agregar(j)
+
+    def _aplicar(self, j: Jugador, estado: Tuple[int, str, int, bool], signo: int):
+        clave, rol, nivel, completo = estado
+        self._arbol.sumar(clave, signo)
+        cubeta = self._cubetas.setdefault(clave, {})
+        if signo > 0:
+            cubeta[id(j)] = j
+        else:
+            del cubeta[id(j)]
+            if not cubeta:
+                del self._cubetas[clave]
+        r = self.por_rol.setdefault(rol, {"jugadores": 0, "completados": 0, "suma_niveles": 0})
+        r["jugadores"] += signo
+        r["completados"] += signo * completo
+        r["suma_niveles"] += signo * nivel
+        self.por_nivel[nivel] = self.por_nivel.get(nivel, 0) + signo
+        if not self.por_nivel[nivel]:
+            del self.por_nivel[nivel]
+
+    @staticmethod
+    def _estado_de(j: Jugador) -> Tuple[int, str, int, bool]:
+        return (puntuacion(j), j.rol, j.nivel, j.capitulo >= len(CHAPTER_TEXT))
+
+    def agregar(self, j: Jugador):
+        estado = self._estado_de(j)
+        self._estado[id(j)] = estado
+        self._aplicar(j, estado, +1)
+        j.tablero = self
+
+    def quitar(self, j: Jugador):
+        self._aplicar(j, self._estado.pop(id(j)), -1)
+        j.tablero = None
+
+    def actualizar(self, j: Jugador):
+        nuevo = self._estado_de(j)
+        viejo = self._estado[id(j)]
+        if nuevo != viejo:
+            self._aplicar(j, viejo, -1)
+            self._aplicar(j, nuevo, +1)
+            self._estado[id(j)] = nuevo
+
+    def puesto(self, j: Jugador) -> int:
+        """1 = primero. Los empatados comparten puesto."""
+        clave = self._estado[id(j)][0]
+        return 1 + self._arbol.total - self._arbol.prefijo(clave)
+
+    def top(self, n: int) -> List[Jugador]:
+        res: List[Jugador] = []
+        total = self._arbol.total
+        while len(res) < n and len(res) < total:
+            clave = self._arbol.kesimo(total - len(res))
+            res.extend(self._cubetas[clave].values())
+        return res[:n]
+
+    def tasa_completado(self, rol: str) -> float:
+        r = self.por_rol.get(rol)
+        return r["completados"] / r["jugadores"] if r and r["jugadores"] else 0.0
+
+    def nivel_medio(self, rol: str) -> float:
+        r = self.por_rol.get(rol)
+        return r["suma_niveles"] / r["jugadores"] if r and r["jugadores"] else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "top": [
+                {"nombre": j.nombre, "rol": j.rol, "nivel": j.nivel, "xp": j.xp,
+                 "capitulo": j.capitulo, "puesto": self.puesto(j)}
+                for j in self.top(TOP_PERSISTIDO)
+            ],
+            "por_rol": {rol: dict(r) for rol, r in self.por_rol.items() if r["jugadores"]},
+            "por_nivel": {str(n): c for n, c in sorted(self.por_nivel.items())},
+        }
+
+def mostrar_clasificacion(tablero: Clasificacion, n: int = 10):
+    top = tablero.top(n)
+    if not top:
+        print(CLR_Y + "No hay jugadores registrados." + CLR_RST)
+        return
+    print(CLR_B + f"\n=== Top {n} ===" + CLR_RST)
+    for j in top:
+        print(f"{tablero.puesto(j)}. {j.nombre} | Rol: {j.rol} | Nivel: {j.nivel} | XP: {j.xp} | Cap: {j.capitulo}/{len(CHAPTER_TEXT)}")
+    print(CLR_B + "\n=== Por rol ===" + CLR_RST)
+    for rol in ROLES:
+        r = tablero.por_rol.get(rol)
+        if r and r["jugadores"]:
+            print(f"{rol}: {r['jugadores']} jugadores | Nivel medio: {tablero.nivel_medio(rol):.1f} | "
+                  f"Campaña completa: {tablero.tasa_completado(rol):.0%}")
+    print(CLR_B + "\n=== Distribución de niveles ===" + CLR_RST)
+    for nivel, c in sorted(tablero.por_nivel.items()):
+        print(f"Nivel {nivel}: {c}")
+
 # =========================
 # Persistencia
 # =========================
-def guardar_jugadores(jugadores: List[Jugador], archivo: str = SAVE_FILE):
-    with open(archivo, "w", encoding="utf-8") as f:
-        json.dump([j.to_dict() for j in jugadores], f, ensure_ascii=False, indent=2)
-    print(CLR_B + "💾 Progreso guardado." + CLR_RST)
+def _escribir_atomico(datos, archivo: str):
+    # Escribe a un temporal propio y lo renombra: el JSON nunca queda a medias
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(archivo)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, archivo)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
 
 def cargar_jugadores(archivo: str = SAVE_FILE) -> List[Jugador]:
     if not os.path.exists(archivo):
@@ -280,32 +617,151 @@ def cargar_jugadores(archivo: str = SAVE_FILE) -> List[Jugador]:
     except Exception:
         return []
 
+class AutoGuardado:
+    """
+    Escritor en segundo plano. marcar() copia el estado en el hilo del menú
+    (sin E/S) y sigue; el hilo espera un momento para agrupar varias marcas
+    seguidas en una sola escritura atómica de la última copia. cerrar()
+    vacía lo pendiente antes de salir. Si recibe una Clasificacion, la
+    guarda junto al archivo de jugadores.
+    """
+
+    def __init__(self, archivo: str = SAVE_FILE, espera: float = 0.5,
+                 tablero: Optional[Clasificacion] = None):
+        self.archivo = archivo
+        self.espera = espera
+        self.tablero = tablero
+        self.archivo_tablero = os.path.join(os.path.dirname(archivo), RANKING_FILE)
+        # Una sola escritura a la vez, la haga el hilo o flush()
+        self._escritura = threading.Lock()
+        self._cond = threading.Condition()
+        self._pendiente: Optional[Tuple[list, Optional[dict]]] = None
+        self._sucio = False
+        self._cerrado = False
+        self._hilo = threading.Thread(target=self._bucle, name="autoguardado", daemon=True)
+        self._hilo.start()
+
+    def marcar(self, jugadores: List[Jugador]):
+        """Copia el estado actual y avisa; no bloquea por la E/S."""
+        copia = ([j.to_dict() for j in jugadores], self.tablero.to_dict() if self.tablero else None)
+        with self._cond:
+            self._pendiente = copia
+            self._sucio = True
+            self._cond.notify()
+
+    def _tomar_pendiente(self) -> Optional[Tuple[list, Optional[dict]]]:
+        with self._cond:
+            if not self._sucio:
+                return None
+            self._sucio = False
+            return self._pendiente
+
+    def _escribir(self, pendiente: Tuple[list, Optional[dict]]):
+        datos, datos_tablero = pendiente
+        with self._escritura:
+            _escribir_atomico(datos, self.archivo)
+            if datos_tablero is not None:
+                _escribir_atomico(datos_tablero, self.archivo_tablero)
+
+    def _esperar_hasta(self, limite: float):
+        """Espera hasta `limite` (monotonic) aunque lleguen marcas; sale si se cierra."""
+        while not self._cerrado:
+            resto = limite - time.monotonic()
+            if resto <= 0:
+                return
+            self._cond.wait(resto)
+
+    def _bucle(self):
+        fallos = 0
+        while True:
+            with self._cond:
+                while not self._sucio and not self._cerrado:
+                    self._cond.wait()
+                if self._cerrado:
+                    return
+                # Ventana de agrupación: más marcas en este lapso = 1 escritura.
+                # Tras fallos de disco la espera crece (hasta 30 s).
+                self._esperar_hasta(time.monotonic() + min(30.0, self.espera * 2 ** fallos))
+            pendiente = self._tomar_pendiente()
+            if pendiente is not None:
+                try:
+                    self._escribir(pendiente)
+                except OSError as e:
+                    if not fallos:
+                        print(CLR_R + f"\n⚠️ No se pudo auto-guardar: {e}" + CLR_RST)
+                    fallos += 1
+                    with self._cond:
+                        # Se reintenta con la copia más nueva que haya
+                        self._sucio = True
+                else:
+                    if fallos:
+                        print(CLR_G + "\n💾 Auto-guardado restablecido." + CLR_RST)
+                    fallos = 0
+
+    def flush(self):
+        """Escribe ya lo pendiente, en el hilo que llama."""
+        pendiente = self._tomar_pendiente()
+        if pendiente is not None:
+            self._escribir(pendiente)
+
+    def cerrar(self):
+        with self._cond:
+            self._cerrado = True
+            self._cond.notify()
+        self._hilo.join()
+        self.flush()
+
 # =========================
 # Enemigos y eventos
 # =========================
 def make_enemy(name: str, hp: int, atk: Tuple[int, int], xp: int, bleed: int = 0) -> Dict:
     return {"nombre": name, "vida": hp, "ataque": atk, "xp": xp, "sangrado": bleed}
 
+# Tabla de dificultad. Valores a mano por defecto; balance_dificultad.py
+# genera DIFICULTAD_FILE y cargar_dificultad() la aplica al iniciar.
+DIFICULTAD_FILE = "dificultad.json"
+
+# Ajustes ligeros por rol al HP enemigo
+MULT_ROL = {"Gobierno": 1.0, "Narco": 1.05, "Puntero": 0.95, "Vecino": 0.9}
+
+# Secuencia larga de la campaña (12+ encuentros potenciales)
+ENEMIGOS_BASE: List[Tuple[str, int, Tuple[int, int], int]] = [
+    ("Punteros rivales", 60, (8, 12), 30),
+    ("Convoy ligero", 85, (10, 15), 45),
+    ("Sicario en moto", 70, (12, 16), 40),
+    ("Bloqueo callejero", 95, (12, 18), 55),
+    ("Célula armada", 110, (14, 20), 70),
+    ("Emboscada en barrio", 120, (15, 22), 80),
+    ("Francotirador oculto", 90, (18, 26), 90),
+    ("Blindada improvisada", 140, (16, 24), 110),
+    ("Civiles armados", 130, (14, 22), 95),
+    ("Patrulla agresiva", 135, (16, 25), 110),
+    ("Jefe local", 160, (18, 28), 140),
+    ("Comandante enemigo", 190, (20, 30), 180),
+]
+
+def cargar_dificultad(archivo: str = DIFICULTAD_FILE) -> bool:
+    """Aplica la tabla afinada si existe. Devuelve True si se cargó."""
+    if not os.path.exists(archivo):
+        return False
+    try:
+        with open(archivo, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        enemigos = [(n, int(hp), (int(lo), int(hi)), int(xp)) for n, hp, (lo, hi), xp in data["enemigos"]]
+        mult = {rol: float(m) for rol, m in data["mult_rol"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        print(CLR_Y + f"⚠️ {archivo} inválido; se usa la dificultad por defecto." + CLR_RST)
+        return False
+    if len(enemigos) != len(ENEMIGOS_BASE):
+        print(CLR_Y + f"⚠️ {archivo} no tiene {len(ENEMIGOS_BASE)} capítulos; se ignora." + CLR_RST)
+        return False
+    ENEMIGOS_BASE[:] = enemigos
+    MULT_ROL.update(mult)
+    return True
+
 def chapter_enemies_for_role(rol: str) -> List[Dict]:
-    # Secuencia larga de la campaña (12+ encuentros potenciales)
-    # Ajustes ligeros por rol a los nombres/HP
-    mult = {"Gobierno": 1.0, "Narco": 1.05, "Puntero": 0.95, "Vecino": 0.9}.get(rol, 1.0)
-    hp = lambda base: int(base * mult)
-
-    return [
-        make_enemy("Punteros rivales", hp(60), (8, 12), 30),
-        make_enemy("Convoy ligero", hp(85), (10, 15), 45),
-        make_enemy("Sicario en moto", hp(70), (12, 16), 40),
-        make_enemy("Bloqueo callejero", hp(95), (12, 18), 55),
-        make_enemy("Célula armada", hp(110), (14, 20), 70),
-        make_enemy("Emboscada en barrio", hp(120), (15, 22), 80),
-        make_enemy("Francotirador oculto", hp(90), (18, 26), 90),
-        make_enemy("Blindada improvisada", hp(140), (16, 24), 110),
-        make_enemy("Civiles armados", hp(130), (14, 22), 95),
-        make_enemy("Patrulla agresiva", hp(135), (16, 25), 110),
-        make_enemy("Jefe local", hp(160), (18, 28), 140),
-        make_enemy("Comandante enemigo", hp(190), (20, 30), 180),
-    ]
+    mult = MULT_ROL.get(rol, 1.0)
+    return [make_enemy(nombre, int(hp * mult), atk, xp) for nombre, hp, atk, xp in ENEMIGOS_BASE]
 
 def role_line(rol: str, base: str) -> str:
     # Personaliza una línea según el rol para dar sabor narrativo
@@ -441,9 +897,7 @@ def combate(j: Jugador, enemigo: Dict) -> bool:
         if enemigo["vida"] <= 0:
             print(CLR_G + f"✅ {enemigo['nombre']} ha caído." + CLR_RST)
             j.ganar_xp(enemigo["xp"])
-            if enemigo["nombre"].lower().startswith("comandante") and "jefe_derrotado" not in j.logros:
-                j.logros.append("jefe_derrotado")
-                print(CLR_G + f"🏅 Logro: {ACHIEVEMENTS['jefe_derrotado']}" + CLR_RST)
+            j.registrar_victoria(enemigo)
            
             loot_roll = RNG.random()
             if loot_roll < 0.35:
@@ -498,6 +952,7 @@ def tienda(j: Jugador):
         item, cost = stock[idx]
         if j.xp >= cost:
             j.xp -= cost
+            j.evento("xp")
             j.add_item(item, 1)
             print(CLR_G + f"Compraste {item}. Créditos restantes: {j.xp}" + CLR_RST)
         else:
@@ -513,6 +968,288 @@ def descanso(j: Jugador):
         j.add_item("botiquín", 1)
         print(CLR_C + "Mientras descansas, consigues un botiquín." + CLR_RST)
 
+# =========================
+# Combate en grupo (planificador por iniciativa)
+# =========================
+TICK_SANGRADO = 10.0     # cada cuánto hace daño el sangrado
+TICKS_SANGRADO = 5
+DURACION_BUFF = 30.0     # ~3 turnos a velocidad media
+DURACION_CHALECO = 30.0
+XP_MAX_GRUPO = 200       # a lo sumo dos niveles por encuentro
+MAX_OBJETIVOS_MENU = 9   # en modo interactivo se listan los más débiles
+
+class Combatiente:
+    """Participante de un combate en grupo. Los jugadores envuelven su Jugador."""
+    __slots__ = ("nombre", "bando", "vida", "vida_max", "atk_min", "atk_max", "defensa",
+                 "intervalo", "buff", "chaleco", "vivo", "pos", "jugador", "xp")
+
+    def __init__(self, nombre: str, bando: int, vida: int, ataque: Tuple[int, int],
+                 defensa: int = 0, velocidad: float = 10.0,
+                 jugador: Optional[Jugador] = None, xp: int = 0):
+        self.nombre = nombre
+        self.bando = bando          # 0 = jugadores, 1 = enemigos
+        self.vida = vida
+        self.vida_max = vida
+        self.atk_min, self.atk_max = ataque
+        self.defensa = defensa
+        self.intervalo = 100.0 / velocidad
+        self.buff = 0               # estimulantes activos
+        self.chaleco = 0            # golpes que aún absorbe
+        self.vivo = True
+        self.pos = -1               # índice en la lista de vivos de su bando
+        self.jugador = jugador
+        self.xp = xp
+
+    @staticmethod
+    def de_jugador(j: Jugador) -> "Combatiente":
+        c = Combatiente(j.nombre, 0, j.vida, (j.ataque_min, j.ataque_max),
+                        j.defensa_base + j.defensa_bono, 10.0 + j.nivel, jugador=j)
+        c.vida_max = j.vida_max
+        # Lo que trae del combate individual: cargas de chaleco y estimulante
+        c.chaleco = j.chaleco_cargas
+        c.buff = 1 if j.buff_turnos > 0 else 0
+        return c
+
+    @staticmethod
+    def de_enemigo(e: Dict, rng: random.Random = RNG) -> "Combatiente":
+        return Combatiente(e["nombre"], 1, e["vida"], e["ataque"], 0, rng.uniform(8.0, 12.0), xp=e["xp"])
+
+    def usar(self, item: str) -> bool:
+        return self.jugador is not None and self.jugador.remove_item(item, 1)
+
+class CombateGrupal:
+    """
+    Varios jugadores contra grupos de enemigos. Acciones y efectos (sangrado,
+    estimulante, chaleco) son eventos en un montículo ordenado por tiempo:
+    cada paso saca el siguiente evento sin recorrer a los combatientes.
+    Los caídos no se buscan en la cola; sus eventos se descartan al salir.
+    """
+
+    def __init__(self, equipo: List[Combatiente], enemigos: List[Combatiente],
+                 interactivo: bool = False, verboso: bool = True, rng: random.Random = RNG):
+        self.vivos: Tuple[List[Combatiente], List[Combatiente]] = ([], [])
+        self.cola: List[tuple] = []
+        self._seq = itertools.count()
+        self.interactivo = interactivo
+        self.verboso = verboso
+        self.rng = rng
+        self.turnos = 0
+        for c in equipo + enemigos:
+            c.pos = len(self.vivos[c.bando])
+            self.vivos[c.bando].append(c)
+            # Tirada de iniciativa: primer turno dentro de su intervalo
+            self._programar(rng.uniform(0, c.intervalo), "accion", c)
+            if c.buff and c.jugador is not None:
+                # El estimulante traído dura los turnos que le quedaban
+                self._programar(c.jugador.buff_turnos * c.intervalo, "fin_buff", c)
+
+    def _programar(self, t: float, tipo: str, c: Combatiente, dato=None):
+        heapq.heappush(self.cola, (t, next(self._seq), tipo, c, dato))
+
+    def _log(self, msg: str):
+        if self.verboso:
+            print(msg)
+
+    def _retirar(self, c: Combatiente):
+        # Quitar en O(1): el último ocupa su lugar
+        lista = self.vivos[c.bando]
+        ultimo = lista.pop()
+        if ultimo is not c:
+            lista[c.pos] = ultimo
+            ultimo.pos = c.pos
+        c.vivo = False
+
+    def _caida(self, c: Combatiente):
+        if not c.vivo:
+            self._log(CLR_G + f"✅ {c.nombre} ha caído." + CLR_RST if c.bando
+                      else CLR_R + f"💀 {c.nombre} ha caído." + CLR_RST)
+
+    def _dañar(self, c: Combatiente, dmg: int, directo: bool = False) -> int:
+        if not directo:
+            dmg = max(0, dmg - c.defensa)
+            if c.chaleco > 0:
+                dmg -= min(6, dmg)
+                c.chaleco -= 1
+        c.vida -= dmg
+        if c.vida <= 0:
+            self._retirar(c)
+        return dmg
+
+    def _objetivo(self, c: Combatiente) -> Combatiente:
+        rivales = self.vivos[1 - c.bando]
+        if self.interactivo and c.jugador is not None and len(rivales) > 1:
+            debiles = heapq.nsmallest(MAX_OBJETIVOS_MENU, rivales, key=lambda e: e.vida)
+            opciones = [f"{e.nombre} ({e.vida} HP)" for e in debiles]
+            if len(rivales) > len(debiles):
+                opciones.append(f"Uno al azar (quedan {len(rivales)})")
+            idx = ask_choice("¿A quién atacas?", opciones)
+            if idx < len(debiles):
+                return debiles[idx]
+        return rivales[self.rng.randrange(len(rivales))]
+
+    def _elegir(self, c: Combatiente, t: float) -> str:
+        """Política automática; en modo interactivo pregunta al jugador."""
+        inv = c.jugador.inventario if c.jugador else {}
+        if self.interactivo and c.jugador is not None:
+            print(CLR_W + f"\n— {c.nombre} (t={t:.0f}) | Vida {c.vida}/{c.vida_max} | "
+                  f"Enemigos en pie: {len(self.vivos[1])} —" + CLR_RST)
+            opciones = ["atacar", "botiquín"] + [k for k in ("granada", "molotov", "chaleco", "estimulante")
+                                                 if inv.get(k, 0) > 0]
+            return opciones[ask_choice("Acción:", [o.capitalize() for o in opciones])]
+        if c.vida < 0.4 * c.vida_max and inv.get("botiquín", 0) > 0:
+            return "botiquín"
+        if inv.get("granada", 0) > 0 and len(self.vivos[1]) > 2:
+            return "granada"
+        if inv.get("molotov", 0) > 0 and len(self.vivos[1]) > 1:
+            return "molotov"
+        if inv.get("chaleco", 0) > 0 and not c.chaleco and len(self.vivos[1]) >= len(self.vivos[0]):
+            return "chaleco"
+        if inv.get("estimulante", 0) > 0 and not c.buff:
+            return "estimulante"
+        return "atacar"
+
+    def _actuar(self, c: Combatiente, t: float):
+        if c.bando == 1:
+            obj = self._objetivo(c)
+            dmg = self._dañar(obj, self.rng.randint(c.atk_min, c.atk_max))
+            self._log(CLR_R + f"{c.nombre} ataca a {obj.nombre}: {dmg} de daño." + CLR_RST)
+            self._caida(obj)
+            return
+        accion = self._elegir(c, t)
+        if accion != "atacar" and not c.usar(accion):
+            self._log(CLR_Y + f"{c.nombre} no tiene {accion}; ataca." + CLR_RST)
+            accion = "atacar"
+        if accion == "botiquín":
+            cur = self.rng.randint(30, 45)
+            c.vida = min(c.vida_max, c.vida + cur)
+            self._log(CLR_G + f"🩹 {c.nombre} se cura {cur}." + CLR_RST)
+        elif accion == "granada":
+            obj = self._objetivo(c)
+            dmg = self._dañar(obj, self.rng.randint(35, 45), directo=True)
+            self._log(CLR_Y + f"💣 {c.nombre} lanza una granada a {obj.nombre}: {dmg} de daño." + CLR_RST)
+            self._caida(obj)
+        elif accion == "molotov":
+            obj = self._objetivo(c)
+            dmg = self._dañar(obj, self.rng.randint(25, 35), directo=True)
+            if obj.vivo:
+                self._programar(t + TICK_SANGRADO, "sangrado", obj, (2, TICKS_SANGRADO))
+            self._log(CLR_Y + f"🔥 {c.nombre} incendia a {obj.nombre}: {dmg} de daño y sangrado." + CLR_RST)
+            self._caida(obj)
+        elif accion == "chaleco":
+            # Al vencer solo se pierden las cargas de este chaleco
+            self._programar(t + DURACION_CHALECO, "fin_chaleco", c, c.chaleco)
+            c.chaleco += 3
+            self._log(CLR_C + f"🧥 {c.nombre} se equipa un chaleco." + CLR_RST)
+        elif accion == "estimulante":
+            c.buff += 1
+            self._programar(t + DURACION_BUFF, "fin_buff", c)
+            self._log(CLR_M + f"⚡ {c.nombre} se inyecta un estimulante." + CLR_RST)
+        else:
+            obj = self._objetivo(c)
+            bono = 5 if c.buff else 0
+            base = self.rng.randint(c.atk_min + bono, c.atk_max + bono)
+            crit = 1.5 if self.rng.random() < 0.15 else 1.0
+            dmg = self._dañar(obj, int(base * crit), directo=True)
+            nota = " (CRÍTICO)" if crit > 1.0 else ""
+            self._log(CLR_G + f"{c.nombre} golpea a {obj.nombre}: {dmg} de daño{nota}." + CLR_RST)
+            self._caida(obj)
+
+    def resolver(self) -> bool:
+        """Procesa eventos hasta que un bando cae. True si ganan los jugadores."""
+        while self.vivos[0] and self.vivos[1] and self.cola:
+            t, _, tipo, c, dato = heapq.heappop(self.cola)
+            if not c.vivo:
+                continue
+            if tipo == "accion":
+                self.turnos += 1
+                self._actuar(c, t)
+                if c.vivo:
+                    self._programar(t + c.intervalo, "accion", c)
+            elif tipo == "sangrado":
+                dmg, restantes = dato
+                self._dañar(c, dmg, directo=True)
+                self._log(CLR_Y + f"🩸 {c.nombre} sangra: {dmg} de daño." + CLR_RST)
+                self._caida(c)
+                if c.vivo and restantes > 1:
+                    self._programar(t + TICK_SANGRADO, "sangrado", c, (dmg, restantes - 1))
+            elif tipo == "fin_buff":
+                c.buff -= 1
+            elif tipo == "fin_chaleco":
+                c.chaleco = min(c.chaleco, dato)
+        return bool(self.vivos[0])
+
+def combate_grupal(jugadores: List[Jugador], enemigos: List[Dict], interactivo: bool = True) -> bool:
+    """Combate de grupo con el roster real: aplica vida, XP y logros al terminar."""
+    equipo = [Combatiente.de_jugador(j) for j in jugadores]
+    rivales = [Combatiente.de_enemigo(e) for e in enemigos]
+    print(CLR_R + f"\n💥 {len(equipo)} jugadores contra {len(rivales)} enemigos!" + CLR_RST)
+    pelea = CombateGrupal(equipo, rivales, interactivo=interactivo)
+    victoria = pelea.resolver()
+    supervivientes = [c for c in equipo if c.vivo]
+    for c in equipo:
+        j = c.jugador
+        j.vida = c.vida if c.vivo else max(1, j.vida_max // 2)
+        j.chaleco_cargas = c.chaleco if c.vivo else 0
+        j.buff_turnos = 0  # el estimulante se agota en la pelea
+    if victoria:
+        # Se reparte entre todo el grupo y con tope: una incursión masiva
+        # no puede saltarse la progresión por capítulos
+        xp = min(XP_MAX_GRUPO, sum(e.xp for e in rivales) // len(equipo))
+        jefe = max(enemigos, key=lambda e: e["xp"])
+        for c in supervivientes:
+            c.jugador.ganar_xp(xp)
+            c.jugador.registrar_victoria(jefe)
+        print(CLR_G + f"🎉 Victoria en {pelea.turnos} turnos. +{xp} XP por superviviente." + CLR_RST)
+    else:
+        print(CLR_R + f"💀 El grupo fue derrotado tras {pelea.turnos} turnos." + CLR_RST)
+    return victoria
+
+def menu_combate_grupal(jugadores: List[Jugador]):
+    if not jugadores:
+        print(CLR_Y + "No hay jugadores registrados." + CLR_RST)
+        return
+    listar_jugadores(jugadores)
+    raw = input("Números de jugadores separados por coma (vacío = todos): ").strip()
+    try:
+        numeros = [int(x) for x in raw.split(",")] if raw else list(range(1, len(jugadores) + 1))
+    except ValueError:
+        numeros = [0]
+    if not all(1 <= k <= len(jugadores) for k in numeros):
+        print(CLR_Y + "Selección inválida." + CLR_RST)
+        return
+    # Sin repetidos: un mismo jugador no puede pelear dos veces
+    elegidos = [jugadores[k - 1] for k in dict.fromkeys(numeros)]
+    cap = ask_int(f"Capítulo del enemigo (1-{len(ENEMIGOS_BASE)}): ", 1, len(ENEMIGOS_BASE)) - 1
+    n = ask_int("Cantidad de enemigos (1-500): ", 1, 500)
+    modo = ask_choice("¿Cómo se juega?", ["Elegir cada acción", "Automático"])
+    base = chapter_enemies_for_role(elegidos[0].rol)[cap]
+    enemigos = [dict(base, nombre=f"{base['nombre']} #{i + 1}") for i in range(n)]
+    combate_grupal(elegidos, enemigos, interactivo=(modo == 0))
+
+def benchmark_grupo(por_bando: int = 1000, repeticiones: int = 10):
+    """Turnos resueltos por segundo en combates grandes sin salida por pantalla."""
+    rng = random.Random(0)
+    # Plantillas de jugador creadas una vez; cada combate las bifurca
+    plantillas = []
+    with contextlib.redirect_stdout(io.StringIO()):  # sin avisos de logros
+        for i in range(por_bando):
+            j = Jugador(f"J{i}", rng.choice(list(ROLES)), nivel=rng.randint(1, 4))
+            for item, n in (("botiquín", 3), ("granada", 2), ("molotov", 1), ("chaleco", 1), ("estimulante", 1)):
+                j.add_item(item, n)
+            plantillas.append(j)
+    base = chapter_enemies_for_role("Gobierno")[3]
+    turnos, dt = 0, 0.0
+    for _ in range(repeticiones):
+        equipo = [Combatiente.de_jugador(Jugador.desde_checkpoint(j.checkpoint())) for j in plantillas]
+        rivales = [Combatiente.de_enemigo(dict(base, nombre=f"E{i}"), rng) for i in range(por_bando)]
+        t0 = time.perf_counter()
+        pelea = CombateGrupal(equipo, rivales, verboso=False, rng=rng)
+        pelea.resolver()
+        dt += time.perf_counter() - t0
+        turnos += pelea.turnos
+    print(f"{por_bando} vs {por_bando}, {repeticiones} combates: {turnos} turnos en {dt:.2f} s "
+          f"({turnos / dt:,.0f} turnos/s)")
+
 # =========================
 # Campaña/Aventura
 # =========================
@@ -556,17 +1293,12 @@ def aventura_larga(j: Jugador):
     else:
         print(CLR_C + f"Retomas la campaña desde el capítulo {cap+1}/{total_caps}." + CLR_RST)
 
-    superados_en_esta_sesion = 0
-
     while cap < total_caps and j.vida > 0:
         exito = jugar_capitulo(j, cap)
         if exito:
             cap += 1
-            superados_en_esta_sesion += 1
             j.capitulo = cap
-            if superados_en_esta_sesion == 3 and "tres_capitulos" not in j.logros:
-                j.logros.append("tres_capitulos")
-                print(CLR_G + f"🏅 Logro: {ACHIEVEMENTS['tres_capitulos']}" + CLR_RST)
+            j.registrar_capitulo()
         else:
             # Derrota: no avanza capítulo, pero puede seguir intentando
             print(CLR_Y + "Te replegaste a un punto seguro. Podrás intentarlo otra vez." + CLR_RST)
@@ -574,8 +1306,6 @@ def aventura_larga(j: Jugador):
 
     if cap >= total_caps:
         print(CLR_G + f"\n🎉 ¡{j.nombre} completó la campaña! Nivel {j.nivel}, XP {j.xp}, Vida {j.vida}/{j.vida_max}" + CLR_RST)
-        if "primer_combo" not in j.logros:
-            j.logros.append("primer_combo")  # usar como 'campaña completa' si no se logró antes
     else:
         print(CLR_C + f"\nProgreso: Capítulo {cap}/{total_caps}. Puedes continuar más tarde." + CLR_RST)
 
@@ -617,13 +1347,15 @@ def seleccionar_jugador(jugadores: List[Jugador]) -> Optional[Jugador]:
     idx = ask_int("Elige número de jugador: ", 1, len(jugadores)) - 1
     return jugadores[idx]
 
-def eliminar_jugador(jugadores: List[Jugador]) -> List[Jugador]:
+def eliminar_jugador(jugadores: List[Jugador], tablero: Optional[Clasificacion] = None) -> List[Jugador]:
     if not jugadores:
         print(CLR_Y + "No hay jugadores para eliminar." + CLR_RST)
         return jugadores
     listar_jugadores(jugadores)
     idx = ask_int("Elige número a eliminar: ", 1, len(jugadores)) - 1
     j = jugadores.pop(idx)
+    if tablero is not None:
+        tablero.quitar(j)
     print(CLR_R + f"Jugador {j.nombre} eliminado." + CLR_RST)
     return jugadores
 
@@ -642,7 +1374,21 @@ def renombrar_jugador(jugadores: List[Jugador]):
 # Menú principal
 # =========================
 def menu():
+    cargar_dificultad()
     jugadores = cargar_jugadores()
+    tablero = Clasificacion(jugadores)
+    autoguardado = AutoGuardado(tablero=tablero)
+    try:
+        _menu_bucle(jugadores, tablero, autoguardado)
+    finally:
+        # Salida normal o Ctrl+C: el estado actual se escribe sí o sí,
+        # después de que el hilo termina su última escritura
+        autoguardado.marcar(jugadores)
+        autoguardado.cerrar()
+    print(CLR_B + "💾 Progreso guardado." + CLR_RST)
+    print(CLR_C + "¡Hasta la próxima!" + CLR_RST)
+
+def _menu_bucle(jugadores: List[Jugador], tablero: Clasificacion, autoguardado: AutoGuardado):
     while True:
         print(CLR_M + "\n=== MENÚ PRINCIPAL ===" + CLR_RST)
         print("1) Crear jugador")
@@ -651,13 +1397,16 @@ def menu():
         print("4) Jugar campaña con TODOS los jugadores")
         print("5) Renombrar jugador")
         print("6) Eliminar jugador")
-        print("7) Guardar y salir")
+        print("7) Clasificación y estadísticas")
+        print("8) Combate en grupo")
+        print("9) Guardar y salir")
 
-        op = ask_int("> ", 1, 7)
+        op = ask_int("> ", 1, 9)
         if op == 1:
             j = crear_jugador()
             jugadores.append(j)
-            guardar_jugadores(jugadores)
+            tablero.agregar(j)
+            autoguardado.marcar(jugadores)
         elif op == 2:
             listar_jugadores(jugadores)
             pause()
@@ -665,7 +1414,7 @@ def menu():
             j = seleccionar_jugador(jugadores)
             if j:
                 aventura_larga(j)
-                guardar_jugadores(jugadores)
+                autoguardado.marcar(jugadores)
                 pause()
         elif op == 4:
             if not jugadores:
@@ -675,27 +1424,35 @@ def menu():
             for j in jugadores:
                 print(CLR_W + f"\n>>> Jugando con {j.nombre}..." + CLR_RST)
                 aventura_larga(j)
-            guardar_jugadores(jugadores)
+                autoguardado.marcar(jugadores)
             pause()
         elif op == 5:
             renombrar_jugador(jugadores)
-            guardar_jugadores(jugadores)
+            autoguardado.marcar(jugadores)
         elif op == 6:
-            jugadores = eliminar_jugador(jugadores)
-            guardar_jugadores(jugadores)
+            eliminar_jugador(jugadores, tablero)
+            autoguardado.marcar(jugadores)
+        elif op == 7:
+            mostrar_clasificacion(tablero)
+            pause()
+        elif op == 8:
+            menu_combate_grupal(jugadores)
+            autoguardado.marcar(jugadores)
+            pause()
         else:
-            guardar_jugadores(jugadores)
-            print(CLR_C + "¡Hasta la próxima!" + CLR_RST)
             break
 
 # =========================
 # Main
 # =========================
 if __name__ == "__main__":
+    if "--bench-grupo" in sys.argv:
+        benchmark_grupo()
+        sys.exit()
     try:
         clear()
         print(CLR_W + "RPG de Consola — Aventura de Culiacán (Texto Interactivo)\n" + CLR_RST)
         menu()
     except KeyboardInterrupt:
-        print("\nSalida por teclado. Progreso auto-guardado (si hubo cambios).")
+        print("\nSalida por teclado. Progreso auto-guardado.")
 
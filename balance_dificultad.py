@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Afinador offline de dificultad para Examen.py
+---------------------------------------------
+- Simula campañas completas sin E/S (combate con política automática)
+- Busca MULT_ROL y la escala de HP/ataque de cada capítulo para que la
+  tasa de victoria por capítulo siga la curva OBJETIVO de cada rol
+  (el nivel medio alcanzado se informa, no se usa como objetivo)
+- Evalúa vecinos en paralelo, descarta temprano a los malos y no repite
+  conjuntos de parámetros ya evaluados
+- Escribe DIFICULTAD_FILE, que el juego carga al iniciar
+
+Ejecuta:
+    python balance_dificultad.py [--campañas 300] [--segundos 240] [--procesos N]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Tuple
+
+import Examen as juego
+
+ROLES = list(juego.ROLES)
+N_CAPS = len(juego.ENEMIGOS_BASE)
+
+# Tasa de victoria deseada por rol y capítulo: cómodo al principio,
+# exigente al final. Los civiles terminan con una curva más suave.
+EXTREMOS_OBJETIVO = {
+    "Gobierno": (0.95, 0.60),
+    "Narco": (0.95, 0.60),
+    "Puntero": (0.95, 0.65),
+    "Vecino": (0.97, 0.70),
+}
+OBJETIVO: Dict[str, List[float]] = {
+    rol: [ini + (fin - ini) * c / (N_CAPS - 1) for c in range(N_CAPS)]
+    for rol, (ini, fin) in ((r, EXTREMOS_OBJETIVO.get(r, (0.95, 0.65))) for r in ROLES)
+}
+MAX_REINTENTOS = 3
+
+# Parámetros: [mult por rol] + [escala HP por capítulo] + [escala ataque por capítulo]
+Parametros = Tuple[float, ...]
+LIMITES = [(0.5, 2.0)] * len(ROLES) + [(0.3, 5.0)] * N_CAPS + [(0.3, 5.0)] * N_CAPS
+
+# =========================
+# Simulación sin E/S
+# =========================
+def _combate(p: Dict, e_hp: int, e_lo: int, e_hi: int, rng: random.Random) -> bool:
+    """Mismas reglas que juego.combate, con una política fija en lugar del menú."""
+    inv = p["inv"]
+    sangrado = 0
+    for _ in range(200):
+        if p["vida"] < 0.4 * p["vida_max"] and inv["botiquín"] > 0:
+            inv["botiquín"] -= 1
+            p["vida"] = min(p["vida_max"], p["vida"] + rng.randint(30, 45))
+        elif inv["granada"] > 0 and e_hp >= 35:
+            inv["granada"] -= 1
+            e_hp -= rng.randint(35, 45)
+        elif inv["molotov"] > 0 and e_hp >= 40:
+            inv["molotov"] -= 1
+            e_hp -= rng.randint(25, 35)
+            sangrado += 2
+        elif inv["chaleco"] > 0 and p["chaleco"] == 0 and e_hp > 60:
+            inv["chaleco"] -= 1
+            p["chaleco"] += 3
+        elif inv["estimulante"] > 0 and p["buff"] == 0 and e_hp > 60:
+            inv["estimulante"] -= 1
+            p["buff"] += 3
+        else:
+            bono = 5 if p["buff"] > 0 else 0
+            base = rng.randint(p["atk_min"] + bono, p["atk_max"] + bono)
+            e_hp -= int(base * (1.5 if rng.random() < 0.15 else 1.0))
+
+        if sangrado > 0 and e_hp > 0:
+            e_hp -= sangrado
+
+        if e_hp <= 0:
+            return True
+
+        dmg = max(0, rng.randint(e_lo, e_hi) - p["defensa"])
+        if p["chaleco"] > 0:
+            dmg -= min(6, dmg)
+            p["chaleco"] -= 1
+        p["vida"] -= dmg
+        if p["buff"] > 0:
+            p["buff"] -= 1
+        if p["vida"] <= 0:
+            return False
+    return False
+
+def _ganar_xp(p: Dict, xp: int):
+    p["xp"] += xp
+    while p["xp"] >= 100:
+        p["xp"] -= 100
+        p["nivel"] += 1
+        p["vida_max"] += 20
+        p["vida"] = p["vida_max"]
+        p["atk_min"] += 1
+        p["atk_max"] += 2
+
+def _botin(p: Dict, rng: random.Random):
+    r = rng.random()
+    if r < 0.35:
+        p["inv"]["botiquín"] += 1
+    elif r < 0.55:
+        p["inv"]["granada"] += 1
+    elif r < 0.70:
+        p["inv"]["molotov"] += 1
+
+def _jugador_inicial(rol: str) -> Dict:
+    base = juego.ROLES[rol]
+    inv = dict.fromkeys(juego.USABLES, 0)
+    inv.update({"botiquín": 2, "granada": 1, "cuchillo": 1})
+    return {
+        "vida": base["vida"], "vida_max": base["vida"], "nivel": 1, "xp": 0,
+        "atk_min": base["ataque"][0], "atk_max": base["ataque"][1],
+        "defensa": base["defensa"], "buff": 0, "chaleco": 0, "inv": inv,
+    }
+
+def enemigos(params: Parametros, rol: str) -> List[Tuple[str, int, Tuple[int, int], int]]:
+    mult = params[ROLES.index(rol)]
+    esc_hp = params[len(ROLES):len(ROLES) + N_CAPS]
+    esc_atk = params[len(ROLES) + N_CAPS:]
+    res = []
+    for c, (nombre, hp, (lo, hi), xp) in enumerate(juego.ENEMIGOS_BASE):
+        lo2 = max(1, round(lo * esc_atk[c]))
+        res.append((nombre, max(1, int(hp * esc_hp[c] * mult)), (lo2, max(lo2, round(hi * esc_atk[c]))), xp))
+    return res
+
+def simular_campaña(params: Parametros, rol: str, rng: random.Random,
+                    victorias: List[int], intentos: List[int], niveles: List[int]):
+    """Campaña completa; acumula victorias/intentos/nivel por capítulo."""
+    p = _jugador_inicial(rol)
+    for c, (_, hp, (lo, hi), xp) in enumerate(enemigos(params, rol)):
+        if c in (2, 5, 8, 10) and p["vida"] < 0.6 * p["vida_max"]:
+            p["vida"] = min(p["vida_max"], p["vida"] + rng.randint(20, 35))
+        for _ in range(MAX_REINTENTOS):
+            intentos[c] += 1
+            niveles[c] += p["nivel"]
+            if _combate(p, hp, lo, hi, rng):
+                victorias[c] += 1
+                _ganar_xp(p, xp)
+                _botin(p, rng)
+                break
+            # Derrota como en juego.combate: lo gastado no vuelve y la vida queda a la mitad
+            p["vida"] = max(1, p["vida_max"] // 2)
+        else:
+            return
+
+# =========================
+# Evaluación (en procesos)
+# =========================
+def evaluar(params: Parametros, campañas: int, semilla: int) -> Tuple[float, Dict]:
+    """Error cuadrático respecto a la curva OBJETIVO de cada rol, sumado sobre roles y capítulos."""
+    error = 0.0
+    detalle = {}
+    for i, rol in enumerate(ROLES):
+        # Mismas semillas para todo candidato: se comparan en igualdad
+        rng = random.Random(semilla * 7919 + i)
+        victorias, intentos, niveles = [0] * N_CAPS, [0] * N_CAPS, [0] * N_CAPS
+        for _ in range(campañas):
+            simular_campaña(params, rol, rng, victorias, intentos, niveles)
+        tasas = []
+        for c in range(N_CAPS):
+            # Capítulo no alcanzado: cuenta como tasa 0 (demasiado difícil antes)
+            tasa = victorias[c] / intentos[c] if intentos[c] else 0.0
+            tasas.append(tasa)
+            error += (tasa - OBJETIVO[rol][c]) ** 2
+        detalle[rol] = {
+            "tasas": [round(t, 3) for t in tasas],
+            "nivel_medio": [round(n / i, 2) if i else None for n, i in zip(niveles, intentos)],
+        }
+    return error, detalle
+
+def _evaluar_tarea(args) -> Tuple[Parametros, float, Dict]:
+    params, campañas, semilla = args
+    error, detalle = evaluar(params, campañas, semilla)
+    return params, error, detalle
+
+# =========================
+# Búsqueda
+# =========================
+def _clave(params: Parametros) -> Parametros:
+    return tuple(round(x, 3) for x in params)
+
+def _vecinos(params: Parametros, paso: float) -> List[Parametros]:
+    res = []
+    for i, (lo, hi) in enumerate(LIMITES):
+        for signo in (1, -1):
+            v = list(params)
+            v[i] = min(hi, max(lo, v[i] * (1 + signo * paso)))
+            if v[i] != params[i]:
+                res.append(_clave(v))
+    return res
+
+def afinar(campañas: int = 300, segundos: float = 240, procesos: int = 0,
+           semilla: int = 1) -> Tuple[Parametros, float, Dict]:
+    """
+    Descenso por coordenadas con paso decreciente. Cada ronda evalúa todos
+    los vecinos en paralelo: primero con pocas campañas (descarte temprano)
+    y solo los prometedores con todas. Las evaluaciones se guardan en caché.
+    """
+    inicio = time.monotonic()
+    rapida = max(20, campañas // 6)
+    cache: Dict[Tuple[Parametros, int], Tuple[float, Dict]] = {}
+
+    actual: Parametros = _clave([juego.MULT_ROL.get(r, 1.0) for r in ROLES] + [1.0] * (2 * N_CAPS))
+    # Paso grande al inicio: con tasas pegadas a 1.0 el error es plano
+    # y los pasos chicos no lo notan
+    paso = 0.5
+
+    with Pool(procesos or None) as pool:
+        def evaluar_varios(lista: List[Parametros], n: int) -> Dict[Parametros, float]:
+            pendientes = [p for p in lista if (p, n) not in cache]
+            for p, err, det in pool.imap_unordered(_evaluar_tarea, [(p, n, semilla) for p in pendientes]):
+                cache[(p, n)] = (err, det)
+            return {p: cache[(p, n)][0] for p in lista}
+
+        mejor_err = evaluar_varios([actual], campañas)[actual]
+        print(f"Inicial: error {mejor_err:.4f}")
+        while paso >= 0.01 and time.monotonic() - inicio < segundos:
+            vecinos = _vecinos(actual, paso)
+            rapidos = evaluar_varios(vecinos + [actual], rapida)
+            # Descarte temprano: solo pasan los que mejoran en la prueba corta
+            prometedores = sorted((p for p in vecinos if rapidos[p] < rapidos[actual]), key=rapidos.get)[:8]
+            if len(prometedores) > 1:
+                # También se prueba aplicar juntas todas las mejoras por coordenada
+                combinado = list(actual)
+                for p in prometedores:
+                    i = next(k for k in range(len(p)) if p[k] != actual[k])
+                    if combinado[i] == actual[i]:
+                        combinado[i] = p[i]
+                prometedores.append(_clave(combinado))
+            completos = evaluar_varios(prometedores, campañas) if prometedores else {}
+            candidato = min(completos, key=completos.get, default=None)
+            if candidato is not None and completos[candidato] < mejor_err:
+                actual, mejor_err = candidato, completos[candidato]
+            else:
+                paso /= 2
+            print(f"  paso {paso:.3f} | error {mejor_err:.4f} | evaluados {len(cache)} | "
+                  f"{time.monotonic() - inicio:.0f} s")
+
+    return actual, mejor_err, cache[(actual, campañas)][1]
+
+def guardar(params: Parametros, detalle: Dict, archivo: str = juego.DIFICULTAD_FILE):
+    data = {
+        "mult_rol": {rol: params[i] for i, rol in enumerate(ROLES)},
+        # El HP va sin el multiplicador de rol: el juego lo aplica al cargar
+        "enemigos": [[n, hp, list(atk), xp] for n, hp, atk, xp in enemigos(
+            tuple([1.0] * len(ROLES)) + params[len(ROLES):], ROLES[0])],
+        "objetivo": {rol: [round(t, 3) for t in curva] for rol, curva in OBJETIVO.items()},
+        # El nivel alcanzado solo se informa (resultado.nivel_medio)
+        "nota": "objetivo por rol y capítulo; el nivel medio se informa, no se ajusta",
+        "resultado": detalle,
+    }
+    tmp = archivo + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, archivo)
+
+def _arg(nombre: str, defecto: float) -> float:
+    if nombre in sys.argv:
+        return float(sys.argv[sys.argv.index(nombre) + 1])
+    return defecto
+
+if __name__ == "__main__":
+    params, error, detalle = afinar(
+        campañas=int(_arg("--campañas", 300)),
+        segundos=_arg("--segundos", 240),
+        procesos=int(_arg("--procesos", 0)),
+    )
+    guardar(params, detalle)
+    print(f"Error final {error:.4f}. Tabla escrita en {juego.DIFICULTAD_FILE}")
+    print("Objetivo por rol y capítulo; el nivel medio por capítulo se informa, no se ajusta.")
+    for rol in ROLES:
+        print(f"{rol:>9}: " + " ".join(f"{t:.2f}" for t in detalle[rol]["tasas"]))
+        print(f"{'objetivo':>9}: " + " ".join(f"{t:.2f}" for t in OBJETIVO[rol]))
+        print(f"{'nivel':>9}: " + " ".join(
+            f"{n:4.1f}" if n is not None else "   -" for n in detalle[rol]["nivel_medio"]))
@@ -0,0 +1,96 @@
+import gc
+import heapq
+import math
+from itertools import islice
+import unicodedata
+from collections import Counter
+
+# Registros recorridos como máximo por las listas que se leen enteras
+MAX_CANDIDATOS = 20000
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos, para que 'María' y 'maria' coincidan"""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def trigramas(texto):
+    """Trigramas por palabra, con relleno como pg_trgm ('  ma', ' mar', ...)"""
+    res = set()
+    for palabra in normalizar(texto).split():
+        p = f"  {palabra} "
+        res.update(p[i:i + 3] for i in range(len(p) - 2))
+    return res
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido trigrama -> claves. Se actualiza con agregar/eliminar
+    y busca por similitud de palabra (como word_similarity de pg_trgm) sin
+    recorrer todos los registros.
+    """
+
+    def __init__(self):
+        self._listas = {}
+        self._docs = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def agregar(self, clave, nombre):
+        if clave in self._docs:
+            self.eliminar(clave)
+        tri = trigramas(nombre)
+        self._docs[clave] = tri
+        for t in tri:
+            self._listas.setdefault(t, set()).add(clave)
+
+    def eliminar(self, clave):
+        for t in self._docs.pop(clave, ()):
+            lista = self._listas[t]
+            lista.discard(clave)
+            if not lista:
+                del self._listas[t]
+
+    def buscar(self, consulta, limite=10, umbral=0.5):
+        """
+        Devuelve [(clave, similitud)] ordenado de mayor a menor. La similitud
+        es la fracción de trigramas de la consulta presentes en el nombre, así
+        'Lop' encuentra 'María Guadalupe López'. Los empates se ordenan por
+        Dice sobre el nombre completo (gana el más parecido en total).
+        """
+        q = trigramas(consulta)
+        if not q:
+            return []
+        # Similitud >= umbral exige compartir al menos m trigramas. Por
+        # palomar, todo resultado aparece en alguna de las len(q) - m + 1
+        # listas más raras: solo esas se recorren.
+        total = len(q)
+        m = max(1, math.ceil(umbral * total - 1e-9))
+        listas = sorted((self._listas.get(t, set()) for t in q), key=len)
+        corte = total - m + 1
+        # Consulta poco selectiva (todas sus listas son enormes): se toma una
+        # muestra de cada lista para que el costo quede acotado
+        tope = max(1000, MAX_CANDIDATOS // corte)
+        # La consulta solo crea contenedores sin ciclos; con millones de
+        # conjuntos en el índice, una pasada del GC costaría más que la búsqueda.
+        gc_activo = gc.isenabled()
+        gc.disable()
+        try:
+            compartidos = Counter()
+            for lista in listas[:corte]:
+                compartidos.update(lista if len(lista) <= tope else islice(lista, tope))
+            # Las listas comunes solo se cruzan con los candidatos ya vistos
+            for lista in listas[corte:]:
+                compartidos.update(compartidos.keys() & lista)
+            docs = self._docs
+            puntuados = [
+                (c / total, 2 * c / (total + len(docs[clave])), clave)
+                for clave, c in compartidos.items() if c >= m
+            ]
+        finally:
+            if gc_activo:
+                gc.enable()
+        mejores = heapq.nlargest(limite, puntuados, key=lambda x: (x[0], x[1]))
+        return [(clave, s) for s, _, clave in mejores]